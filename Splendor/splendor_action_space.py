@@ -0,0 +1,100 @@
+# INFORMATION ------------------------------------------------------------------------------------------------------- #
+
+# Date:    17/10/2026
+# Purpose: Implements a fixed, global index of Splendor's action space, with legal-action masks, for learning agents
+# Notes:   Every action is an instance of one of NUM_ACTIONS templates, which fix everything an agent chooses, and
+#          refer to cards and nobles by where they lie rather than by what they are: a card by its slot (0-11 for the
+#          dealt cards, tier by tier, and 0-2 for the agent's reserved cards), and a noble by its slot on the board
+#          (0-4), or None. What follows from the state is left out: the yellow gem taken with a reservation, and the
+#          gems paid for a purchase. In any state, each legal action is an instance of a different template, so a
+#          template index identifies a legal action. Templates are laid out type by type (collect_diff, collect_same,
+#          reserve, buy_available, buy_reserve, pass), with the noble innermost. Requires numpy.
+
+# IMPORTS ------------------------------------------------------------------------------------------------------------#
+
+
+import itertools
+import numpy as np
+from Splendor.splendor_utils import *
+from Splendor.splendor_compact import CARD_LIST, DEALT
+
+
+# CONSTANTS ----------------------------------------------------------------------------------------------------------#
+
+
+GEM_COLOURS   = list(COLOURS.values())
+NOBLE_CHOICES = [None, 0, 1, 2, 3, 4]
+
+#Gem combinations, as tuples of counts in GEM_COLOURS order.
+gem_counts = lambda gems : tuple(gems.get(c, 0) for c in GEM_COLOURS)
+
+#All ways of returning up to n gems of the given colours.
+def _returns(colours, n):
+    return [gem_counts({c:combo.count(c) for c in combo})
+            for size in range(n+1) for combo in itertools.combinations_with_replacement(colours, size)]
+
+#Templates, as (type, collected gems, returned gems, card slot, noble slot), with None for fields the type lacks.
+TEMPLATES = []
+for combo_length in range(1, 4):
+    for combo in itertools.combinations([c for c in GEM_COLOURS if c!='yellow'], combo_length):
+        collected = gem_counts(dict.fromkeys(combo, 1))
+        for returned in _returns([c for c in GEM_COLOURS if c not in combo], combo_length):
+            TEMPLATES += [('collect_diff', collected, returned, None, n) for n in NOBLE_CHOICES]
+for colour in [c for c in GEM_COLOURS if c!='yellow']:
+    for returned in _returns([c for c in GEM_COLOURS if c!=colour], 2):
+        TEMPLATES += [('collect_same', gem_counts({colour:2}), returned, None, n) for n in NOBLE_CHOICES]
+for slot in range(12):
+    for returned in _returns([c for c in GEM_COLOURS if c!='yellow'], 1):
+        TEMPLATES += [('reserve', None, returned, slot, n) for n in NOBLE_CHOICES]
+TEMPLATES += [('buy_available', None, None, slot, n) for slot in range(12) for n in NOBLE_CHOICES]
+TEMPLATES += [('buy_reserve', None, None, slot, n) for slot in range(3) for n in NOBLE_CHOICES]
+TEMPLATES += [('pass', None, None, None, n) for n in NOBLE_CHOICES]
+
+TEMPLATE_IDS = {template:i for i,template in enumerate(TEMPLATES)}
+NUM_ACTIONS  = len(TEMPLATES)
+
+
+# FUNCTIONS ----------------------------------------------------------------------------------------------------------#
+
+
+#Where the cards and nobles an agent can act on lie in a state, as (dealt card codes by slot, with None for an empty
+#slot, the agent's reserved card codes, and the board's noble codes). Works on SplendorStates and CompactStates.
+def state_slots(state, agent_id):
+    if hasattr(state, 'buf'):
+        dealt = [CARD_LIST[c].code if c >= 0 else None for c in state.buf[DEALT:DEALT+12]]
+        reserved = [CARD_LIST[c].code for c in state.reserved_list(agent_id)]
+        nobles = [NOBLES[n][0] for n in state.nobles_list()]
+    else:
+        dealt = [card.code if card else None for deck in state.board.dealt for card in deck]
+        reserved = [card.code for card in state.agents[agent_id].cards['yellow']]
+        nobles = [code for code,_ in state.board.nobles]
+    return dealt,reserved,nobles
+
+#Index of the template of an action, given the state_slots of the state it's taken in.
+def action_index(action, slots):
+    dealt,reserved,nobles = slots
+    action_type = action['type']
+    collected = returned = slot = None
+    if 'collect' in action_type:
+        collected = gem_counts(action['collected_gems'])
+    if 'collect' in action_type or action_type=='reserve':
+        returned = gem_counts(action['returned_gems'])
+    if action_type in ['reserve', 'buy_available']:
+        slot = dealt.index(action['card'].code)
+    elif action_type=='buy_reserve':
+        slot = reserved.index(action['card'].code)
+    noble = nobles.index(action['noble'][0]) if action['noble'] else None
+    return TEMPLATE_IDS[(action_type, collected, returned, slot, noble)]
+
+#Legal actions (as given by a game rule's getLegalActions) keyed on their template indices.
+def index_actions(actions, slots):
+    return {action_index(action, slots):action for action in actions}
+
+#Boolean array over all templates, marking those of the legal actions.
+def legal_mask(actions, slots):
+    mask = np.zeros(NUM_ACTIONS, dtype=bool)
+    mask[[action_index(action, slots) for action in actions]] = True
+    return mask
+
+
+# END FILE -----------------------------------------------------------------------------------------------------------#
@@ -0,0 +1,217 @@
+# INFORMATION ------------------------------------------------------------------------------------------------------- #
+
+# Date:    17/10/2026
+# Purpose: Implements headless, bulk analysis of Splendor replays, aggregated per agent
+# Notes:   Scans replays (as saved by general_game_runner's --saveGameRecord, in either format; see replay.py) and sums
+#          up how each agent played, by name, across all the games it appears in: action type frequencies, game length,
+#          points over its turns, when it attracted nobles, how it used reserves, and where it was warned. Everything
+#          is read off the recorded actions, without replaying the games, so each replay is streamed through once.
+#          Replays are analysed in parallel by a pool of processes, and their results merged in the order given.
+#
+#          Usage: python -m Splendor.splendor_analytics [-j JOBS] [--json FILE] DIR_OR_REPLAY [...]
+
+# IMPORTS ------------------------------------------------------------------------------------------------------------#
+
+
+import os, sys, json
+from concurrent.futures import ProcessPoolExecutor
+from optparse import OptionParser
+from replay import load_replay
+from Splendor.splendor_model import decode_action, is_action_code
+
+
+# CONSTANTS ----------------------------------------------------------------------------------------------------------#
+
+
+ACTION_TYPES = ['collect_diff', 'collect_same', 'reserve', 'buy_available', 'buy_reserve', 'pass']
+NOBLE_POINTS = 3
+CURVE_STEP   = 5 #Turns between the points of the curves printed by print_summary.
+
+
+# FUNCTIONS ----------------------------------------------------------------------------------------------------------#
+
+
+#Replay files under the given files and directories, in name order within each directory.
+def find_replays(paths):
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            found += [os.path.join(path, f) for f in sorted(os.listdir(path)) if f.endswith('.replay')]
+        else:
+            found.append(path)
+    return found
+
+#Analyse one replay, returning an AgentStats for each of its agents, keyed by name.
+def analyse_replay(path):
+    replay = load_replay(path)
+    names = replay["agents_namelist"]
+    num_of_agent = replay["num_of_agent"]
+    stats = [AgentStats() for _ in range(num_of_agent)]
+    points,turns = [0]*num_of_agent,[0]*num_of_agent
+    warnings = replay["warning_positions"] #Streaming replays fill this in as the moves are read.
+    for item in replay["actions"]:
+        (index, info), = item.items()
+        agent_id,action = info["agent_id"],info["action"]
+        if agent_id >= num_of_agent: #Gamemaster moves aren't any agent's.
+            continue
+        if is_action_code(action):
+            action = decode_action(action)
+        agent = stats[agent_id]
+        agent.actions[action['type']] = agent.actions.get(action['type'], 0) + 1
+        if 'buy' in action['type']:
+            points[agent_id] += action['card'].points
+        if action['noble']:
+            points[agent_id] += NOBLE_POINTS
+            agent.noble_turns.append(turns[agent_id])
+        if (agent_id, index) in warnings:
+            agent.warning_turns.append(turns[agent_id])
+        agent.add_turn(turns[agent_id], points[agent_id])
+        turns[agent_id] += 1
+
+    scores = {int(agent_id):score for agent_id,score in replay["scores"].items()}
+    best = max(scores.values())
+    results = {}
+    for agent_id,agent in enumerate(stats):
+        agent.games = 1
+        agent.turns = turns[agent_id]
+        agent.end_game(turns[agent_id], points[agent_id])
+        agent.points = scores[agent_id]
+        agent.wins = int(scores[agent_id]==best and list(scores.values()).count(best)==1)
+        agent.first_nobles = agent.noble_turns[:1]
+        if names[agent_id] in results: #An agent playing itself is counted once per seat.
+            results[names[agent_id]].merge(agent)
+        else:
+            results[names[agent_id]] = agent
+    return results
+
+#Analyse replays, with jobs processes, returning an AgentStats for each agent, keyed by name.
+def analyse(paths, jobs=1):
+    totals = {}
+    if jobs > 1:
+        with ProcessPoolExecutor(jobs) as pool:
+            results = list(pool.map(analyse_replay, paths, chunksize=max(1, len(paths) // (jobs*8))))
+    else:
+        results = map(analyse_replay, paths)
+    for result in results:
+        for name,stats in result.items():
+            if name in totals:
+                totals[name].merge(stats)
+            else:
+                totals[name] = stats
+    return totals
+
+#Add value to items[index], first extending items with zeros as far as index.
+def _add_at(items, index, value):
+    items.extend([0] * (index + 1 - len(items)))
+    items[index] += value
+
+def print_summary(totals):
+    for name,stats in sorted(totals.items()):
+        summary = stats.summary()
+        print('%s: %d games, %d wins, %.1f turns and %.1f points per game (%.2f per turn), %.2f warnings per game'
+              % (name, summary['games'], summary['wins'], summary['turns_per_game'], summary['points_per_game'],
+                 summary['points_per_turn'], summary['warnings_per_game']))
+        print('  actions: ' + ', '.join('%s %.1f%%' % (t, 100*f) for t,f in summary['action_frequencies'].items()))
+        print('  nobles: %.2f per game, first on turn %s' % (summary['nobles_per_game'],
+              '%.1f' % summary['first_noble_turn'] if summary['first_noble_turn'] is not None else '-'))
+        print('  reserves: %.2f per game, %.0f%% later bought' % (summary['reserves_per_game'],
+              100*summary['reserves_bought']))
+        curve = summary['points_curve']
+        print('  points by turn: ' + ', '.join('%d: %.1f' % (t, curve[t-1]) for t in range(CURVE_STEP, len(curve)+1,
+                                                                                             CURVE_STEP)))
+        if summary['warning_turns']:
+            print('  warned on turns: ' + ', '.join('%d (x%d)' % (t, n) for t,n in summary['warning_turns'].items()))
+
+
+# CLASS DEF ----------------------------------------------------------------------------------------------------------#
+
+
+#Running totals of how an agent played, over one or more games. Turns are counted from 0, in the agent's own turns.
+#The points curve averages over every game at every turn, with games that are already over holding their final points.
+class AgentStats:
+    def __init__(self):
+        self.games         = 0
+        self.wins          = 0
+        self.turns         = 0
+        self.points        = 0
+        self.actions       = {} #Action type -> count.
+        self.noble_turns   = [] #Turns on which nobles were attracted.
+        self.first_nobles  = [] #Turn of each game's first noble, in games with one.
+        self.warning_turns = []
+        self.curve_sums    = [] #Sum, over games lasting that long, of points held after each turn,
+        self.end_sums      = [] #and, by game length, of points held at the end (carried forward on the curve).
+
+    #Add points held after a turn (summed over games) to the points curve.
+    def add_turn(self, turn, points):
+        _add_at(self.curve_sums, turn, points)
+
+    #Add points held at the end of games lasting the given number of turns (summed over games) to the points curve.
+    def end_game(self, turns, points):
+        _add_at(self.end_sums, turns, points)
+
+    def merge(self, other):
+        self.games += other.games
+        self.wins += other.wins
+        self.turns += other.turns
+        self.points += other.points
+        for action_type,count in other.actions.items():
+            self.actions[action_type] = self.actions.get(action_type, 0) + count
+        self.noble_turns += other.noble_turns
+        self.first_nobles += other.first_nobles
+        self.warning_turns += other.warning_turns
+        for turn,total in enumerate(other.curve_sums):
+            self.add_turn(turn, total)
+        for turns,total in enumerate(other.end_sums):
+            self.end_game(turns, total)
+
+    #Averages and frequencies, as a JSON-serialisable dict.
+    def summary(self):
+        games,moves = max(self.games, 1),max(sum(self.actions.values()), 1)
+        warning_turns = {}
+        for turn in sorted(self.warning_turns):
+            warning_turns[turn] = warning_turns.get(turn, 0) + 1
+        reserves = self.actions.get('reserve', 0)
+        curve,ended = [],0
+        for turn,total in enumerate(self.curve_sums):
+            ended += self.end_sums[turn] if turn < len(self.end_sums) else 0 #Games over before this turn.
+            curve.append((total + ended) / games)
+        return {'games'             : self.games,
+                'wins'              : self.wins,
+                'turns_per_game'    : self.turns / games,
+                'points_per_game'   : self.points / games,
+                'points_per_turn'   : self.points / max(self.turns, 1),
+                'action_frequencies': {t:self.actions.get(t, 0) / moves for t in ACTION_TYPES},
+                'nobles_per_game'   : len(self.noble_turns) / games,
+                'first_noble_turn'  : sum(self.first_nobles) / len(self.first_nobles) if self.first_nobles else None,
+                'noble_turns'       : sorted(self.noble_turns),
+                'reserves_per_game' : reserves / games,
+                'reserves_bought'   : self.actions.get('buy_reserve', 0) / reserves if reserves else 0,
+                'points_curve'      : curve,
+                'warnings_per_game' : len(self.warning_turns) / games,
+                'warning_turns'     : warning_turns}
+
+
+# MAIN ---------------------------------------------------------------------------------------------------------------#
+
+
+def main(argv):
+    parser = OptionParser(usage='python -m Splendor.splendor_analytics [options] DIR_OR_REPLAY [...]')
+    parser.add_option('-j', '--jobs', type='int', default=os.cpu_count() or 1,
+                      help='Number of processes to analyse replays with (default: all cores)')
+    parser.add_option('--json', help='Also write the summaries, as JSON, to this file')
+    options,args = parser.parse_args(argv)
+    paths = find_replays(args)
+    if not paths:
+        parser.error('No replays found.')
+    totals = analyse(paths, options.jobs)
+    print('Analysed %d replays.' % len(paths))
+    print_summary(totals)
+    if options.json:
+        with open(options.json, 'w') as f:
+            json.dump({name:stats.summary() for name,stats in totals.items()}, f, indent=2)
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
+
+
+# END FILE -----------------------------------------------------------------------------------------------------------#
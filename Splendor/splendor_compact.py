@@ -0,0 +1,402 @@
+# INFORMATION ------------------------------------------------------------------------------------------------------- #
+
+# Date:    17/10/2026
+# Purpose: Implements a compact, array-backed alternative to SplendorState and its game rule
+# Notes:   A CompactState holds the whole game in one fixed-size array of small integers, with cards and nobles
+#          referred to by their IDs (see CARD_IDS and NOBLE_IDS in splendor_utils). Copying a state is a single buffer
+#          copy, and a two-player state takes a few hundred bytes. CompactGameRule plays by exactly the same rules as
+#          SplendorGameRule, consuming the random number generator in the same way, and produces actions in the same
+#          (dict) form, so agents can be pointed at either. States convert to and from SplendorState.
+
+# IMPORTS ------------------------------------------------------------------------------------------------------------#
+
+
+import random, itertools
+from array import array
+from Splendor.splendor_utils import *
+from Splendor.splendor_model import CARD_LIST, SplendorState, SplendorGameRule, zobrist_hash, encode_action, \
+                                    _encode_action, decode_action, is_action_code
+from template import GameRule
+
+
+# CONSTANTS ----------------------------------------------------------------------------------------------------------#
+
+
+#Gem colours in index order. Bonus (card) counts are indexed the same way; the yellow entry is always zero.
+GEM_COLOURS = list(COLOURS.values())
+GEM_IDX     = {c:i for i,c in enumerate(GEM_COLOURS)}
+YELLOW      = GEM_IDX['yellow']
+
+#Per-card lookups, indexed by card ID (as are the shared Card objects in CARD_LIST).
+CARD_COST   = [[card.cost.get(c, 0) for c in GEM_COLOURS] for card in CARD_LIST]
+CARD_COLOUR = [GEM_IDX[card.colour] for card in CARD_LIST]
+CARD_POINTS = [card.points for card in CARD_LIST]
+CARD_TIER   = [card.deck_id for card in CARD_LIST]
+NOBLE_COST  = [[cost.get(c, 0) for c in GEM_COLOURS] for _,cost in NOBLES]
+DECK_SIZES  = [CARD_TIER.count(i) for i in range(3)]
+
+#Array layout. Card and noble slots hold IDs, with -1 marking an empty slot.
+BOARD_GEMS  = 0                          #Board gem stacks (6).
+DEALT       = BOARD_GEMS + 6             #Dealt cards, tier by tier (3x4).
+DECK_LEN    = DEALT + 12                 #Number of cards left in each deck (3).
+DECKS       = DECK_LEN + 3               #Deck contents, in deck order (40, 30 and 20 slots).
+DECK_START  = [DECKS + sum(DECK_SIZES[:i]) for i in range(3)]
+NOBLE_SLOTS = DECKS + len(CARDS)         #Nobles still on the board, in board order (5).
+OWNER       = NOBLE_SLOTS + 5            #Agent that has bought each card, by card ID (90).
+BOUGHT      = OWNER + len(CARDS)         #Bought cards, in order of purchase (90).
+NUM_BOUGHT  = BOUGHT + len(CARDS)        #Number of cards bought so far (1).
+TO_MOVE     = NUM_BOUGHT + 1             #Agent to move (1).
+AGENTS      = TO_MOVE + 1                #Start of the per-agent blocks.
+
+#Per-agent block layout, relative to the start of the block.
+A_GEMS      = 0                          #Gems held (6).
+A_BONUS     = A_GEMS + 6                 #Cards bought, per colour (6).
+A_RESERVED  = A_BONUS + 6                #Reserved cards, in order of reservation (3).
+A_NOBLES    = A_RESERVED + 3             #Nobles acquired, in order of acquisition (5).
+A_SCORE     = A_NOBLES + 5               #Score (1).
+A_PASSED    = A_SCORE + 1                #Whether the agent passed on its last turn (1).
+AGENT_SIZE  = A_PASSED + 1
+
+
+# CLASS DEF ----------------------------------------------------------------------------------------------------------#
+
+
+class CompactState:
+    __slots__ = ('num_agents', 'buf')
+
+    def __init__(self, num_agents, buf=None):
+        self.num_agents = num_agents
+        self.buf = buf if buf is not None else array('b', [0]*(AGENTS + AGENT_SIZE*num_agents))
+
+    def clone(self):
+        return CompactState(self.num_agents, self.buf[:])
+
+    #Offset of an agent's block within the buffer.
+    def agent(self, agent_id):
+        return AGENTS + AGENT_SIZE*agent_id
+
+    def score(self, agent_id):
+        return self.buf[self.agent(agent_id) + A_SCORE]
+
+    def dealt_list(self):
+        return [c for c in self.buf[DEALT:DEALT+12] if c >= 0]
+
+    def reserved_list(self, agent_id):
+        a = self.agent(agent_id) + A_RESERVED
+        return [c for c in self.buf[a:a+3] if c >= 0]
+
+    def nobles_list(self):
+        return [n for n in self.buf[NOBLE_SLOTS:NOBLE_SLOTS+5] if n >= 0]
+
+    @classmethod
+    def from_state(cls, state):
+        compact = cls(len(state.agents))
+        b,board = compact.buf,state.board
+        for colour,count in board.gems.items():
+            b[BOARD_GEMS + GEM_IDX[colour]] = count
+        for i in range(3):
+            for j,card in enumerate(board.dealt[i]):
+                b[DEALT + 4*i + j] = CARD_IDS[card.code] if card else -1
+            b[DECK_LEN + i] = len(board.decks[i])
+            _fill(b, DECK_START[i], DECK_SIZES[i], [CARD_IDS[card.code] for card in board.decks[i]])
+        _fill(b, NOBLE_SLOTS, 5, [NOBLE_IDS[code] for code,_ in board.nobles])
+        _fill(b, OWNER, len(CARDS), [])
+        bought = []
+        for agent in state.agents:
+            a = compact.agent(agent.id)
+            for colour,count in agent.gems.items():
+                b[a + A_GEMS + GEM_IDX[colour]] = count
+            for colour,cards in agent.cards.items():
+                if colour != 'yellow':
+                    b[a + A_BONUS + GEM_IDX[colour]] = len(cards)
+                    for card in cards:
+                        b[OWNER + CARD_IDS[card.code]] = agent.id
+                        bought.append(CARD_IDS[card.code])
+            _fill(b, a + A_RESERVED, 3, [CARD_IDS[card.code] for card in agent.cards['yellow']])
+            _fill(b, a + A_NOBLES, 5, [NOBLE_IDS[code] for code,_ in agent.nobles])
+            b[a + A_SCORE] = agent.score
+            b[a + A_PASSED] = agent.passed
+        _fill(b, BOUGHT, len(CARDS), bought)
+        b[NUM_BOUGHT] = len(bought)
+        b[TO_MOVE] = state.agent_to_move
+        return compact
+
+    #Rebuild a SplendorState. Cards are the shared objects in CARD_LIST. Agent traces and last actions are not part of
+    #the compact representation, and so come back empty.
+    def to_state(self):
+        b = self.buf
+        state = SplendorState.__new__(SplendorState)
+        board = state.board = SplendorState.BoardState.__new__(SplendorState.BoardState)
+        board.gems   = {c:b[BOARD_GEMS + i] for i,c in enumerate(GEM_COLOURS)}
+        board.dealt  = [[CARD_LIST[c] if c >= 0 else None for c in b[DEALT+4*i:DEALT+4*i+4]] for i in range(3)]
+        board.decks  = [[CARD_LIST[c] for c in b[DECK_START[i]:DECK_START[i]+b[DECK_LEN+i]]] for i in range(3)]
+        board.nobles = [NOBLES[n] for n in self.nobles_list()]
+        state.agents = []
+        for agent_id in range(self.num_agents):
+            a = self.agent(agent_id)
+            agent = SplendorState.AgentState(agent_id)
+            agent.score  = b[a + A_SCORE]
+            agent.gems   = {c:b[a + A_GEMS + i] for i,c in enumerate(GEM_COLOURS)}
+            agent.cards['yellow'] = [CARD_LIST[c] for c in self.reserved_list(agent_id)]
+            agent.bonuses = {c:b[a + A_BONUS + i] for i,c in enumerate(GEM_COLOURS) if c!='yellow'}
+            agent.nobles = [NOBLES[n] for n in b[a+A_NOBLES:a+A_NOBLES+5] if n >= 0]
+            agent.passed = bool(b[a + A_PASSED])
+            state.agents.append(agent)
+        for c in b[BOUGHT:BOUGHT+b[NUM_BOUGHT]]:
+            state.agents[b[OWNER + c]].cards[CARD_LIST[c].colour].append(CARD_LIST[c])
+        state._agent_to_move = b[TO_MOVE]
+        state.zobrist = zobrist_hash(state)
+        return state
+
+
+#Implements game logic over CompactStates. Actions take the same form as those of SplendorGameRule.
+class CompactGameRule(GameRule):
+    def __init__(self, num_of_agent):
+        super().__init__(num_of_agent)
+        self.private_information = None
+
+    def initialGameState(self):
+        return CompactState.from_state(SplendorState(self.num_of_agent))
+
+    def generateSuccessor(self, state, action, agent_id):
+        b,a = state.buf,state.agent(agent_id)
+        score = 0
+        if 'card' in action:
+            card = CARD_IDS[action['card'].code]
+
+        if 'collect' in action['type'] or action['type']=='reserve':
+            for colour,count in action['collected_gems'].items():
+                b[BOARD_GEMS + GEM_IDX[colour]] -= count
+                b[a + A_GEMS + GEM_IDX[colour]] += count
+            for colour,count in action['returned_gems'].items():
+                b[a + A_GEMS + GEM_IDX[colour]] -= count
+                b[BOARD_GEMS + GEM_IDX[colour]] += count
+            if action['type'] == 'reserve':
+                slot = _find(b, DEALT, 12, card)
+                if slot is not None:
+                    self._redeal(b, slot)
+                    _push(b, a + A_RESERVED, 3, card)
+
+        elif 'buy' in action['type']:
+            for colour,count in action['returned_gems'].items():
+                b[a + A_GEMS + GEM_IDX[colour]] -= count
+                b[BOARD_GEMS + GEM_IDX[colour]] += count
+            if 'available' in action['type']:
+                slot = _find(b, DEALT, 12, card)
+                if slot is not None:
+                    self._redeal(b, slot)
+            else:
+                _remove(b, a + A_RESERVED, 3, card)
+            b[a + A_BONUS + CARD_COLOUR[card]] += 1
+            b[OWNER + card] = agent_id
+            b[BOUGHT + b[NUM_BOUGHT]] = card
+            b[NUM_BOUGHT] += 1
+            score += CARD_POINTS[card]
+
+        if action['noble'] and _remove(b, NOBLE_SLOTS, 5, NOBLE_IDS[action['noble'][0]]):
+            _push(b, a + A_NOBLES, 5, NOBLE_IDS[action['noble'][0]])
+            score += 3
+
+        b[a + A_SCORE] += score
+        b[a + A_PASSED] = action['type']=='pass'
+        return state
+
+    #Refill the dealt slot at offset slot exactly as BoardState.deal does: shuffle the deck, then draw its last card.
+    def _redeal(self, b, slot):
+        tier = (slot - DEALT) // 4
+        start,n = DECK_START[tier],b[DECK_LEN + tier]
+        if not n:
+            b[slot] = -1
+            return
+        deck = b[start:start+n].tolist()
+        random.shuffle(deck)
+        b[slot] = deck.pop()
+        b[start:start+n] = array('b', deck + [-1])
+        b[DECK_LEN + tier] -= 1
+
+    def gameEnds(self):
+        b = self.current_game_state.buf
+        deadlock = 0
+        for agent_id in range(self.num_of_agent):
+            a = AGENTS + AGENT_SIZE*agent_id
+            deadlock += 1 if b[a + A_PASSED] else 0
+            if b[a + A_SCORE] >= 15 and self.current_agent_index == 0:
+                return True
+        return deadlock==self.num_of_agent
+
+    #As SplendorGameRule.calScore: tied victors with the fewest cards bought gain half a point.
+    def calScore(self, game_state, agent_id):
+        b = game_state.buf
+        bought = lambda i : sum(b[AGENTS+AGENT_SIZE*i+A_BONUS : AGENTS+AGENT_SIZE*i+A_BONUS+6])
+        scores = [game_state.score(i) for i in range(game_state.num_agents)]
+        victors = [i for i,score in enumerate(scores) if score==max(scores)]
+        if len(victors) > 1 and agent_id in victors:
+            if bought(agent_id)==min(bought(i) for i in range(game_state.num_agents)):
+                return scores[agent_id] + .5
+        return scores[agent_id]
+
+    #Array counterpart of SplendorGameRule.resources_sufficient.
+    def resources_sufficient(self, b, a, card):
+        wild = b[a + A_GEMS + YELLOW]
+        return_combo = {}
+        for i,cost in enumerate(CARD_COST[card]):
+            if not cost:
+                continue
+            gems,bonus = b[a + A_GEMS + i],b[a + A_BONUS + i]
+            wild -= max(cost - gems - bonus, 0)
+            if wild < 0:
+                return False
+            gem_cost = max(cost - bonus, 0)
+            gem_shortfall = max(gem_cost - gems, 0)
+            if gem_cost - gem_shortfall:
+                return_combo[GEM_COLOURS[i]] = gem_cost - gem_shortfall
+            if gem_shortfall:
+                return_combo['yellow'] = return_combo.get('yellow', 0) + gem_shortfall
+        return return_combo
+
+    #Noble n can visit if the agent's bonuses (plus one card of colour extra, if given) cover the noble's cost.
+    def noble_visit(self, b, a, n, extra=None):
+        return all(b[a + A_BONUS + i] + (i==extra) >= cost for i,cost in enumerate(NOBLE_COST[n]))
+
+    #As SplendorGameRule.legalMask.
+    def legalMask(self, game_state, agent_id):
+        from Splendor.splendor_action_space import legal_mask, state_slots
+        return legal_mask(self.getLegalActions(game_state, agent_id), state_slots(game_state, agent_id))
+
+    #Generates the same actions, in the same order, as SplendorGameRule.getLegalActions.
+    def getLegalActions(self, game_state, agent_id):
+        actions = []
+        b,a = game_state.buf,game_state.agent(agent_id)
+        agent_gems = {c:b[a + A_GEMS + i] for i,c in enumerate(GEM_COLOURS)}
+        board_nobles = game_state.nobles_list()
+        potential_nobles = [NOBLES[n] for n in board_nobles if self.noble_visit(b, a, n)] or [None]
+        return_combos = lambda collected : SplendorGameRule.generate_return_combos(self, agent_gems, collected)
+
+        available_colours = [c for i,c in enumerate(GEM_COLOURS) if i!=YELLOW and b[BOARD_GEMS + i]>0]
+        num_holding_gem = sum(agent_gems.values())
+        min_comb_len = min(3 if num_holding_gem<=7 else 2 if num_holding_gem==8 else 1, len(available_colours))
+        for combo_length in range(min_comb_len, min(len(available_colours), 3) + 1):
+            for combo in itertools.combinations(available_colours, combo_length):
+                collected_gems = {colour:1 for colour in combo}
+                if collected_gems:
+                    for returned_gems in return_combos(collected_gems):
+                        for noble in potential_nobles:
+                            actions.append({'type': 'collect_diff',
+                                            'collected_gems': collected_gems,
+                                            'returned_gems': returned_gems,
+                                            'noble': noble})
+
+        for i,colour in enumerate(GEM_COLOURS):
+            if i!=YELLOW and b[BOARD_GEMS + i]>=4:
+                collected_gems = {colour:2}
+                for returned_gems in return_combos(collected_gems):
+                    for noble in potential_nobles:
+                        actions.append({'type': 'collect_same',
+                                        'collected_gems': collected_gems,
+                                        'returned_gems': returned_gems,
+                                        'noble': noble})
+
+        dealt,reserved = game_state.dealt_list(),game_state.reserved_list(agent_id)
+        if len(reserved) < 3:
+            collected_gems = {'yellow':1} if b[BOARD_GEMS + YELLOW]>0 else {}
+            for returned_gems in return_combos(collected_gems):
+                for card in dealt:
+                    for noble in potential_nobles:
+                        actions.append({'type': 'reserve',
+                                        'card': CARD_LIST[card],
+                                        'collected_gems': collected_gems,
+                                        'returned_gems': returned_gems,
+                                        'noble': noble})
+
+        for card in dealt + reserved:
+            if b[a + A_BONUS + CARD_COLOUR[card]] == 7:
+                continue
+            returned_gems = self.resources_sufficient(b, a, card)
+            if type(returned_gems)==dict:
+                new_nobles = [NOBLES[n] for n in board_nobles if self.noble_visit(b, a, n, CARD_COLOUR[card])] or [None]
+                for noble in new_nobles:
+                    actions.append({'type': 'buy_reserve' if card in reserved else 'buy_available',
+                                    'card': CARD_LIST[card],
+                                    'returned_gems': returned_gems,
+                                    'noble': noble})
+
+        if not actions:
+            for noble in potential_nobles:
+                actions.append({'type': 'pass', 'noble':noble})
+        return actions
+
+
+# FUNCTIONS ----------------------------------------------------------------------------------------------------------#
+
+
+#Helpers for the fixed-size, -1 padded ID lists within a buffer.
+def _fill(b, start, size, ids):
+    b[start:start+size] = array('b', ids + [-1]*(size-len(ids)))
+
+def _find(b, start, size, x):
+    for i in range(start, start+size):
+        if b[i]==x:
+            return i
+    return None
+
+def _push(b, start, size, x):
+    i = _find(b, start, size, -1)
+    b[i] = x
+
+#Remove x, shifting later entries down to preserve their order. Return whether x was found.
+def _remove(b, start, size, x):
+    i = _find(b, start, size, x)
+    if i is None:
+        return False
+    b[i:start+size-1] = b[i+1:start+size]
+    b[start+size-1] = -1
+    return True
+
+
+#Wire format for agents run in subprocesses (see ProcessWorker in worker.py). A state is packed as its number of agents,
+#its CompactState buffer, then (as 64-bit ints) each agent's last action and agent trace, which the buffer leaves out:
+#the last action's encoding (or -1), the trace's length, its actions' encodings and then their rewards. A list of
+#actions is packed as their encodings. The action an agent selects travels back as its encoding, which the game accepts
+#as is, or, if it can't be encoded, as it is, for the game to reject.
+def pack_state(state):
+    tail = []
+    for agent in state.agents:
+        trace = agent.agent_trace.action_reward
+        tail.append(_encode_action(agent.last_action) if agent.last_action else -1)
+        tail.append(len(trace))
+        tail += [_encode_action(action) for action,_ in trace]
+        tail += [reward for _,reward in trace]
+    return bytes([len(state.agents)]) + CompactState.from_state(state).buf.tobytes() + array('q', tail).tobytes()
+
+def unpack_state(data):
+    num_agents = data[0]
+    size = 1 + AGENTS + AGENT_SIZE*num_agents
+    state = CompactState(num_agents, array('b', data[1:size])).to_state()
+    tail,i = array('q', data[size:]),0
+    for agent in state.agents:
+        last_action,length = tail[i],tail[i+1]
+        actions,rewards = tail[i+2:i+2+length],tail[i+2+length:i+2+2*length]
+        agent.agent_trace.action_reward = [(decode_action(code), reward) for code,reward in zip(actions, rewards)]
+        agent.last_action = decode_action(last_action) if last_action >= 0 else None
+        i += 2 + 2*length
+    return state
+
+def pack_actions(actions):
+    return array('q', [_encode_action(action) for action in actions]).tobytes()
+
+def unpack_actions(data):
+    return [decode_action(code) for code in array('q', data)]
+
+def pack_action(action):
+    if is_action_code(action):
+        return int(action)
+    try:
+        return encode_action(action)
+    except ValueError:
+        return action
+
+def unpack_action(data):
+    return data
+
+
+# END FILE -----------------------------------------------------------------------------------------------------------#
@@ -405,7 +405,7 @@ class GUIDisplayer(Displayer):
         
     def _InsertState(self, text, game_state):
         text = text.replace("\n ","")
-        self.game_state_history.append(copy.deepcopy(game_state))
+        self.game_state_history.append(game_state.clone())
         self.move_box.insert(tkinter.END,text)
         self.move_box.see(tkinter.END)
         self.move_box.selection_clear(0, last=None)
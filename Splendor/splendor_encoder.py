@@ -0,0 +1,109 @@
+# INFORMATION ------------------------------------------------------------------------------------------------------- #
+
+# Date:    17/10/2026
+# Purpose: Implements a fixed-length NumPy encoding of Splendor states, for learning agents
+# Notes:   States are encoded from the point of view of one agent (by default, the agent to move), whose features come
+#          first, followed by the other agents' in turn order. Encoding goes through the states' CompactState buffers,
+#          from which every feature is gathered for the whole batch at once, so encode_states costs little more per
+#          state than the conversion to a buffer. Buffers (such as SplendorVecEnv's observations) can be encoded
+#          directly with encode_buffers. Requires numpy.
+#
+#          Layout (see the offsets below), with cards encoded as CARD_FEATURES and nobles as NOBLE_FEATURES:
+#            board gems (6), dealt cards (12 cards), deck sizes (3), nobles (5 nobles), then for each agent:
+#            gems (6), bonuses (5), score, nobles acquired, passed, cards bought per tier (3), reserved cards (3 cards).
+#          Gems are in COLOURS order (black, red, yellow, green, blue, white); bonuses skip yellow. Empty card and
+#          noble slots are all zeros.
+
+# IMPORTS ------------------------------------------------------------------------------------------------------------#
+
+
+import numpy as np
+from Splendor.splendor_compact import *
+
+
+# CONSTANTS ----------------------------------------------------------------------------------------------------------#
+
+
+BONUS_IDX = [i for i,c in enumerate(GEM_COLOURS) if c!='yellow']
+
+#Card features: present, points, tier (one-hot, 3), colour (one-hot, 5), cost (5). Row 0 is an empty slot, and row
+#i+1 card ID i, so that rows can be looked up by ID + 1.
+CARD_FEATURES = np.zeros((len(CARD_LIST)+1, 15), dtype=np.float32)
+for i in range(len(CARD_LIST)):
+    CARD_FEATURES[i+1, 0] = 1
+    CARD_FEATURES[i+1, 1] = CARD_POINTS[i]
+    CARD_FEATURES[i+1, 2 + CARD_TIER[i]] = 1
+    CARD_FEATURES[i+1, 5 + BONUS_IDX.index(CARD_COLOUR[i])] = 1
+    CARD_FEATURES[i+1, 10:15] = [CARD_COST[i][j] for j in BONUS_IDX]
+
+#Noble features: present, cost (5). Rows as for CARD_FEATURES.
+NOBLE_FEATURES = np.zeros((len(NOBLES)+1, 6), dtype=np.float32)
+for i in range(len(NOBLES)):
+    NOBLE_FEATURES[i+1, 0] = 1
+    NOBLE_FEATURES[i+1, 1:6] = [NOBLE_COST[i][j] for j in BONUS_IDX]
+
+TIER_ONE_HOT = np.eye(3, dtype=np.float32)[CARD_TIER]
+
+#Offsets of the features in an encoding.
+F_BOARD_GEMS = 0
+F_DEALT      = F_BOARD_GEMS + 6
+F_DECK_LEN   = F_DEALT + 12*CARD_FEATURES.shape[1]
+F_NOBLES     = F_DECK_LEN + 3
+F_AGENTS     = F_NOBLES + 5*NOBLE_FEATURES.shape[1]
+
+#Offsets within each agent's features.
+F_GEMS       = 0
+F_BONUS      = F_GEMS + 6
+F_SCORE      = F_BONUS + 5
+F_NUM_NOBLES = F_SCORE + 1
+F_PASSED     = F_NUM_NOBLES + 1
+F_TIERS      = F_PASSED + 1
+F_RESERVED   = F_TIERS + 3
+F_AGENT_SIZE = F_RESERVED + 3*CARD_FEATURES.shape[1]
+
+
+# FUNCTIONS ----------------------------------------------------------------------------------------------------------#
+
+
+#Length of the encoding of a num_agents-player state.
+def encoding_size(num_agents=2):
+    return F_AGENTS + F_AGENT_SIZE*num_agents
+
+def encode_state(state, agent_id=None):
+    return encode_states([state], None if agent_id is None else [agent_id])[0]
+
+#Encode a list of states (with the same number of agents), as rows of a float32 array. agent_ids optionally gives the
+#point of view of each.
+def encode_states(states, agent_ids=None):
+    bufs = b''.join([CompactState.from_state(state).buf.tobytes() for state in states])
+    return encode_buffers(np.frombuffer(bufs, dtype=np.int8).reshape(len(states), -1), len(states[0].agents), agent_ids)
+
+#Encode CompactState buffers, given as rows of an int8 array.
+def encode_buffers(bufs, num_agents=2, agent_ids=None):
+    bufs = np.asarray(bufs).astype(np.int64)
+    n = len(bufs)
+    out = np.zeros((n, encoding_size(num_agents)), dtype=np.float32)
+    out[:, F_BOARD_GEMS:F_BOARD_GEMS+6] = bufs[:, BOARD_GEMS:BOARD_GEMS+6]
+    out[:, F_DEALT:F_DECK_LEN] = CARD_FEATURES[bufs[:, DEALT:DEALT+12] + 1].reshape(n, -1)
+    out[:, F_DECK_LEN:F_DECK_LEN+3] = bufs[:, DECK_LEN:DECK_LEN+3]
+    out[:, F_NOBLES:F_AGENTS] = NOBLE_FEATURES[bufs[:, NOBLE_SLOTS:NOBLE_SLOTS+5] + 1].reshape(n, -1)
+
+    #Agents in turn order from each state's point of view, and their blocks of the buffers, as (state, agent, field).
+    view = bufs[:, TO_MOVE] if agent_ids is None else np.asarray(agent_ids)
+    order = (view[:, None] + np.arange(num_agents)) % num_agents
+    blocks = bufs[np.arange(n)[:, None, None], (AGENTS + AGENT_SIZE*order)[:, :, None] + np.arange(AGENT_SIZE)]
+    owned = bufs[:, None, OWNER:OWNER+len(CARD_LIST)] == order[:, :, None]
+
+    agents = np.zeros((n, num_agents, F_AGENT_SIZE), dtype=np.float32)
+    agents[:, :, F_GEMS:F_GEMS+6] = blocks[:, :, A_GEMS:A_GEMS+6]
+    agents[:, :, F_BONUS:F_BONUS+5] = blocks[:, :, A_BONUS:A_BONUS+6][:, :, BONUS_IDX]
+    agents[:, :, F_SCORE] = blocks[:, :, A_SCORE]
+    agents[:, :, F_NUM_NOBLES] = (blocks[:, :, A_NOBLES:A_NOBLES+5] >= 0).sum(axis=2)
+    agents[:, :, F_PASSED] = blocks[:, :, A_PASSED]
+    agents[:, :, F_TIERS:F_TIERS+3] = owned @ TIER_ONE_HOT
+    agents[:, :, F_RESERVED:] = CARD_FEATURES[blocks[:, :, A_RESERVED:A_RESERVED+3] + 1].reshape(n, num_agents, -1)
+    out[:, F_AGENTS:] = agents.reshape(n, -1)
+    return out
+
+
+# END FILE -----------------------------------------------------------------------------------------------------------#
@@ -0,0 +1,156 @@
+# INFORMATION ------------------------------------------------------------------------------------------------------- #
+
+# Date:    17/10/2026
+# Purpose: Implements a vectorised environment, stepping a batch of Splendor games in lockstep, for training agents
+# Notes:   Each game is played by CompactGameRule, whose engine objects are kept and reset between games. Every step
+#          plays one action in each game, by whichever agent is to move there.
+#          Observations are the games' encodings (see splendor_encoder), from the point of view of the agent to move,
+#          as rows of a float32 array, or optionally their raw CompactState buffers, as rows of an int8 array. Actions
+#          are indices into the fixed action space of splendor_action_space, and the legal actions of each game are
+#          given as a row of a boolean mask over it. Finished games are reset automatically. Each game draws its random
+#          numbers from a generator of its own, seeded from the environment's seed, so a batch plays out the same way
+#          whether or not it is split over worker processes. The engine draws them from the global random generator,
+#          which is reseeded from a game's own before each move, so its state is saved and put back around the making
+#          of the engine objects and every reset and step, leaving the caller's random numbers undisturbed.
+#          Requires numpy.
+
+# IMPORTS ------------------------------------------------------------------------------------------------------------#
+
+
+import random, multiprocessing
+import numpy as np
+from Splendor.splendor_compact import CompactGameRule, TO_MOVE
+from Splendor.splendor_encoder import encode_buffers
+from Splendor.splendor_action_space import NUM_ACTIONS, index_actions, state_slots
+
+
+# FUNCTIONS ----------------------------------------------------------------------------------------------------------#
+
+
+#Main loop of a worker process, which steps the games it is given and sends back their results.
+def _serve(conn, seeds, num_agents, encode):
+    batch = _Batch(seeds, num_agents, encode)
+    while True:
+        request = conn.recv()
+        if request is None:
+            return
+        conn.send(batch.reset() if request[0]=='reset' else batch.step(request[1]))
+
+
+# CLASS DEF ----------------------------------------------------------------------------------------------------------#
+
+
+#A batch of games, played in this process.
+class _Batch:
+    def __init__(self, seeds, num_agents, encode):
+        self.encode = encode
+        self.rngs  = [random.Random(seed) for seed in seeds]
+        outer = random.getstate() #Rules deal out a first game (replaced on reset) as they are made.
+        self.rules = [CompactGameRule(num_agents) for _ in seeds]
+        random.setstate(outer)
+
+    def reset(self):
+        outer = random.getstate()
+        try:
+            for i in range(len(self.rules)):
+                self._reset(i)
+        finally:
+            random.setstate(outer)
+        return self._observe()
+
+    #Play actions[i] in game i. Rewards are the points scored by the agent that acted.
+    def step(self, actions):
+        rewards = np.zeros(len(self.rules), dtype=np.float32)
+        dones   = np.zeros(len(self.rules), dtype=bool)
+        infos   = [{} for _ in self.rules]
+        outer   = random.getstate()
+        try:
+            for i,rule in enumerate(self.rules):
+                agent_id = rule.current_agent_index
+                before   = rule.current_game_state.score(agent_id)
+                random.seed(self.rngs[i].getrandbits(64))
+                rule.update(self.legal[i][int(actions[i])])
+                rewards[i] = rule.current_game_state.score(agent_id) - before
+                rule.current_game_state.buf[TO_MOVE] = rule.current_agent_index
+                if rule.gameEnds():
+                    dones[i] = True
+                    infos[i]['scores'] = [rule.calScore(rule.current_game_state, j) for j in range(rule.num_of_agent)]
+                    self._reset(i)
+        finally:
+            random.setstate(outer)
+        obs,masks = self._observe()
+        return obs,rewards,dones,masks,infos
+
+    def _reset(self, i):
+        rule = self.rules[i]
+        random.seed(self.rngs[i].getrandbits(64))
+        rule.current_game_state  = rule.initialGameState()
+        rule.current_agent_index = 0
+        rule.action_counter      = 0
+
+    def _observe(self):
+        obs = np.stack([np.frombuffer(rule.current_game_state.buf, dtype=np.int8) for rule in self.rules])
+        if self.encode:
+            obs = encode_buffers(obs, self.rules[0].num_of_agent)
+        masks = np.zeros((len(self.rules), NUM_ACTIONS), dtype=bool)
+        self.legal = []
+        for i,rule in enumerate(self.rules):
+            state,agent_id = rule.current_game_state,rule.current_agent_index
+            self.legal.append(index_actions(rule.getLegalActions(state, agent_id), state_slots(state, agent_id)))
+            masks[i, list(self.legal[i])] = True
+        return obs,masks
+
+
+#num_envs games between num_agents agents. With processes > 0, the games are split between that many worker processes.
+#With encode unset, observations are raw buffers.
+#reset() returns (observations, legal masks). step(actions) takes an action index for each game, and returns
+#(observations, rewards, dones, legal masks, infos); the info of a game that has just finished holds its final scores,
+#and its observation is of the game that replaced it.
+class SplendorVecEnv:
+    def __init__(self, num_envs, num_agents=2, seed=0, processes=0, encode=True):
+        seeds = [seed*num_envs + i for i in range(num_envs)]
+        self.num_envs = num_envs
+        if processes:
+            size = -(-num_envs // processes)
+            self.conns,self.processes = [],[]
+            for start in range(0, num_envs, size):
+                conn,child_conn = multiprocessing.Pipe()
+                process = multiprocessing.Process(target=_serve, args=(child_conn, seeds[start:start+size], num_agents,
+                                                  encode), daemon=True)
+                process.start()
+                self.conns.append(conn)
+                self.processes.append(process)
+            self.sizes = [len(seeds[start:start+size]) for start in range(0, num_envs, size)]
+        else:
+            self.batch = _Batch(seeds, num_agents, encode)
+            self.conns,self.processes = [],[]
+
+    def reset(self):
+        if not self.processes:
+            return self.batch.reset()
+        for conn in self.conns:
+            conn.send(('reset',))
+        return self._gather([conn.recv() for conn in self.conns])
+
+    def step(self, actions):
+        if not self.processes:
+            return self.batch.step(actions)
+        start = 0
+        for conn,size in zip(self.conns, self.sizes):
+            conn.send(('step', actions[start:start+size]))
+            start += size
+        return self._gather([conn.recv() for conn in self.conns])
+
+    def close(self):
+        for conn,process in zip(self.conns, self.processes):
+            conn.send(None)
+            process.join()
+        self.processes = []
+
+    #Concatenate the workers' results, field by field.
+    def _gather(self, results):
+        return tuple(np.concatenate(field) if isinstance(field[0], np.ndarray) else sum(field, [])
+                     for field in zip(*results))
+
+
+# END FILE -----------------------------------------------------------------------------------------------------------#
@@ -7,22 +7,86 @@
 # IMPORTS ------------------------------------------------------------------------------------------------------------#
 
 
-import random, itertools, copy
+import random, itertools, copy, numbers
 from Splendor.splendor_utils import *
 from template import GameState, GameRule
+from snapshot import share
 import Splendor.splendor_utils as utils
 
+# CONSTANTS ----------------------------------------------------------------------------------------------------------#
+
+
+#Memoised return-gem combinations, as built by build_return_combos. See SplendorGameRule.generate_return_combos.
+RETURN_COMBOS = {}
+
+#Zobrist keys: a random 64-bit int per (feature, value) pair, where a state's hash is the xor of the keys of everything
+#in it. Drawn from a fixed-seed generator, so that hashes are stable across runs and the global random state is untouched.
+#Tables are sized for up to 4 agents, and for the highest gem counts and scores reachable.
+ZOBRIST_RNG   = random.Random(90054)
+_zobrist_keys = lambda n : [ZOBRIST_RNG.getrandbits(64) for _ in range(n)]
+MAX_SCORE = sum(points for _,_,_,points in CARDS.values()) + 3*len(NOBLES)
+
+ZOBRIST_BOARD_GEMS    = {c:_zobrist_keys(11) for c in COLOURS.values()}
+ZOBRIST_DEALT         = {code:_zobrist_keys(4) for code in CARDS}      #Keyed on card code, then slot within its row.
+ZOBRIST_DECK_SIZE     = [_zobrist_keys(41) for deck_id in range(3)]
+ZOBRIST_BOARD_NOBLES  = dict(zip([code for code,_ in NOBLES], _zobrist_keys(len(NOBLES))))
+ZOBRIST_AGENT_GEMS    = [{c:_zobrist_keys(16) for c in COLOURS.values()} for i in range(4)]
+ZOBRIST_AGENT_CARDS   = [dict(zip(CARDS, _zobrist_keys(len(CARDS)))) for i in range(4)]
+ZOBRIST_AGENT_RESERVE = [dict(zip(CARDS, _zobrist_keys(len(CARDS)))) for i in range(4)]
+ZOBRIST_AGENT_NOBLES  = [dict(zip([code for code,_ in NOBLES], _zobrist_keys(len(NOBLES)))) for i in range(4)]
+ZOBRIST_AGENT_SCORE   = [_zobrist_keys(MAX_SCORE+1) for i in range(4)]
+ZOBRIST_TO_MOVE       = _zobrist_keys(4)
+
+#Integer action encoding (see encode_action). From the lowest bits up: action type (3 bits), card ID and noble ID (7 and
+#4 bits, offset by one so that zero means none), then gems collected (2 bits per colour) and gems returned (3 bits per
+#colour), in COLOURS order. Each action type has a fixed set of fields.
+ACTION_TYPES  = ['collect_diff', 'collect_same', 'reserve', 'buy_available', 'buy_reserve', 'pass']
+ACTION_FIELDS = {'collect_diff' : ['type', 'collected_gems', 'returned_gems', 'noble'],
+                 'collect_same' : ['type', 'collected_gems', 'returned_gems', 'noble'],
+                 'reserve'      : ['type', 'card', 'collected_gems', 'returned_gems', 'noble'],
+                 'buy_available': ['type', 'card', 'returned_gems', 'noble'],
+                 'buy_reserve'  : ['type', 'card', 'returned_gems', 'noble'],
+                 'pass'         : ['type', 'noble']}
+ACTION_TYPE_IDS  = {action_type:i for i,action_type in enumerate(ACTION_TYPES)}
+CARD_SHIFT,NOBLE_SHIFT,COLLECTED_SHIFT,RETURNED_SHIFT = 3,10,14,26
+COLLECTED_SHIFTS = {colour:COLLECTED_SHIFT + 2*i for i,colour in enumerate(COLOURS.values())}
+RETURNED_SHIFTS  = {colour:RETURNED_SHIFT + 3*i for i,colour in enumerate(COLOURS.values())}
+
+
 # CLASS DEF ----------------------------------------------------------------------------------------------------------#       
 
 
-#Represents cards with a colour (str), unique code (str), resource costs (dict), deck ID (int), and points (int).
+#Resource costs of cards and nobles: dicts of colour -> number, shared by every game, and so never modified.
+class Cost(dict):
+    def _read_only(self, *args, **kwargs):
+        raise TypeError('Costs of cards and nobles cannot be modified.')
+    __setitem__ = __delitem__ = __ior__ = clear = pop = popitem = setdefault = update = _read_only
+    def __deepcopy__(self, memo): #Copies are ordinary dicts, free to be modified.
+        return dict(self)
+    def __reduce__(self):
+        return Cost, (dict(self),)
+
+
+#Represents cards with a colour (str), unique code (str), resource costs (Cost), deck ID (int), and points (int). Cards
+#can't be modified, so they are shared by states and their clones (and agents), rather than copied. Deep copies, which
+#agents may make to work on, have ordinary dicts for costs.
 class Card():
     def __init__(self, colour, code, cost, deck_id, points):
-        self.colour = colour
-        self.code = code        
-        self.cost = cost
-        self.deck_id = deck_id
-        self.points = points
+        object.__setattr__(self, 'colour', colour)
+        object.__setattr__(self, 'code', code)
+        object.__setattr__(self, 'cost', Cost(cost))
+        object.__setattr__(self, 'deck_id', deck_id)
+        object.__setattr__(self, 'points', points)
+    def __setattr__(self, name, value):
+        raise AttributeError('Cards cannot be modified.')
+    def __delattr__(self, name):
+        raise AttributeError('Cards cannot be modified.')
+    def __deepcopy__(self, memo):
+        new = memo[id(self)] = object.__new__(Card)
+        new.__dict__.update(self.__dict__, cost=dict(self.cost))
+        return new
+    def __reduce__(self):
+        return Card, (self.colour, self.code, dict(self.cost), self.deck_id, self.points)
     def __str__(self):
         gem_string = ''
         for colour,number in self.cost.items():
@@ -34,13 +98,42 @@ class Card():
         return hasattr(other, 'code') and other.code==self.code and self.points==other.points==CARDS[other.code][-1]
     
 
+#Shared Card objects, indexed by card ID (see CARD_IDS). Decoded actions refer to these.
+CARD_LIST = [Card(colour, code, cost, deck_id-1, points) for code,(colour,cost,deck_id,points) in CARDS.items()]
+#Nobles are likewise shared by every game, so their costs are made read-only, in place, for NOBLES' other users too.
+NOBLES[:] = [(code, Cost(cost)) for code,cost in NOBLES]
+share(Card, Cost) #Agents are handed cards and costs as they are (see snapshot.py), rather than views of them.
+
+
 #Represents game as agents playing on a board with cards, gems, and nobles.
 class SplendorState(GameState):           
     def __init__(self, num_agents):
         self.board  =  self.BoardState(num_agents)
         self.agents = [self.AgentState(i) for i in range(num_agents)]
-        self.agent_to_move = 0
+        self._agent_to_move = 0
+        self.zobrist = zobrist_hash(self)
     
+    #The side to move is part of the Zobrist hash, so the hash is kept in step whenever it is set. Note that the engine
+    #doesn't advance it in generateSuccessor; it is set by the game (and may be by searches) before each turn.
+    @property
+    def agent_to_move(self):
+        return self._agent_to_move
+
+    @agent_to_move.setter
+    def agent_to_move(self, agent_id):
+        self.zobrist ^= ZOBRIST_TO_MOVE[self._agent_to_move] ^ ZOBRIST_TO_MOVE[agent_id]
+        self._agent_to_move = agent_id
+    
+    #Return a structural copy of this state, for use in place of copy.deepcopy. Cards and nobles are shared with the
+    #original, as the engine never modifies them; only the gem, card and noble containers that actions modify are copied.
+    def clone(self):
+        new = self.__class__.__new__(self.__class__)
+        new.board = self.board.clone()
+        new.agents = [agent.clone() for agent in self.agents]
+        new._agent_to_move = self._agent_to_move
+        new.zobrist = self.zobrist
+        return new
+
     # def __repr__(self) -> str:
     #     return super().__repr__()
 
@@ -77,6 +170,15 @@ class SplendorState(GameState):
                 return self.decks[deck_id].pop()
             return None
         
+        #Copy decks, dealt slots, gems and nobles without re-running __init__ (which would deal a fresh board).
+        def clone(self):
+            new = self.__class__.__new__(self.__class__)
+            new.decks  = [list(deck) for deck in self.decks]
+            new.dealt  = [list(deck) for deck in self.dealt]
+            new.gems   = dict(self.gems)
+            new.nobles = list(self.nobles)
+            return new
+
         def dealt_list(self):
             return [card for deck in self.dealt for card in deck if card]
         
@@ -102,11 +204,27 @@ class SplendorState(GameState):
             self.score  = 0
             self.gems   = {c: 0 for c in COLOURS.values()}
             self.cards  = {c:[] for c in COLOURS.values()}
+            #Number of bought cards of each colour (i.e. each of cards' non-yellow stacks), kept in step with cards so
+            #that cost and noble checks needn't count the stacks.
+            self.bonuses = {c:0 for c in COLOURS.values() if c!='yellow'}
             self.nobles = []
             self.passed = False
             self.agent_trace = AgentTrace(_id)
             self.last_action = None
         
+        def clone(self):
+            new = self.__class__.__new__(self.__class__)
+            new.id     = self.id
+            new.score  = self.score
+            new.gems   = dict(self.gems)
+            new.cards  = {c:list(cards) for c,cards in self.cards.items()}
+            new.bonuses = dict(self.bonuses)
+            new.nobles = list(self.nobles)
+            new.passed = self.passed
+            new.agent_trace = self.agent_trace.clone()
+            new.last_action = self.last_action
+            return new
+        
         def __str__(self) -> str:
             output = ""
             output += "Agent (%d): \n" % (self.id)
@@ -117,26 +235,210 @@ class SplendorState(GameState):
             return output
         
 
+#Compute a state's Zobrist hash from scratch. The engine otherwise updates state.zobrist incrementally as actions are
+#applied and undone, so this is only needed for states built by other means, or to check the incremental hash.
+def zobrist_hash(state):
+    board,h = state.board,ZOBRIST_TO_MOVE[state.agent_to_move]
+    for colour,count in board.gems.items():
+        h ^= ZOBRIST_BOARD_GEMS[colour][count]
+    for deck_id in range(3):
+        h ^= ZOBRIST_DECK_SIZE[deck_id][len(board.decks[deck_id])]
+        for i,card in enumerate(board.dealt[deck_id]):
+            if card:
+                h ^= ZOBRIST_DEALT[card.code][i]
+    for code,_ in board.nobles:
+        h ^= ZOBRIST_BOARD_NOBLES[code]
+    for agent in state.agents:
+        h ^= ZOBRIST_AGENT_SCORE[agent.id][agent.score]
+        for colour,count in agent.gems.items():
+            h ^= ZOBRIST_AGENT_GEMS[agent.id][colour][count]
+        for colour,cards in agent.cards.items():
+            keys = ZOBRIST_AGENT_RESERVE[agent.id] if colour=='yellow' else ZOBRIST_AGENT_CARDS[agent.id]
+            for card in cards:
+                h ^= keys[card.code]
+        for code,_ in agent.nobles:
+            h ^= ZOBRIST_AGENT_NOBLES[agent.id][code]
+    return h
+
+#Zobrist keys for the board's and an agent's stacks of the given gem colours.
+def _zobrist_gems(board, agent, colours):
+    h = 0
+    for colour in colours:
+        h ^= ZOBRIST_BOARD_GEMS[colour][board.gems[colour]] ^ ZOBRIST_AGENT_GEMS[agent.id][colour][agent.gems[colour]]
+    return h
+
+#Zobrist keys for the card dealt at board.dealt[deck_id][i], and for the size of the deck it is dealt from.
+def _zobrist_slot(board, deck_id, i):
+    card = board.dealt[deck_id][i]
+    return ZOBRIST_DECK_SIZE[deck_id][len(board.decks[deck_id])] ^ (ZOBRIST_DEALT[card.code][i] if card else 0)
+
+
+#Whether x is an action's encoding: any integer (including numpy's), but not a bool.
+def is_action_code(x):
+    return isinstance(x, numbers.Integral) and not isinstance(x, bool)
+
+#Encode an action as an int (see ACTION_TYPES). Raises ValueError for anything that isn't a well-formed action, including
+#actions with tampered cards or nobles, which would not compare equal to the engine's own.
+def encode_action(action):
+    try:
+        if set(action) != set(ACTION_FIELDS[action['type']]):
+            raise ValueError('Unexpected action fields: %s.' % list(action))
+        if 'card' in action and CARDS[action['card'].code][-1] != action['card'].points:
+            raise ValueError('Card %s has been tampered with.' % action['card'].code)
+        if action['noble'] and NOBLES[NOBLE_IDS[action['noble'][0]]] != action['noble']:
+            raise ValueError('Noble %s has been tampered with.' % action['noble'][0])
+        for field,limit in [('collected_gems', 4), ('returned_gems', 8)]:
+            for colour,count in action.get(field, {}).items():
+                if colour not in COLLECTED_SHIFTS or type(count)!=int or not 0 < count < limit:
+                    raise ValueError('Invalid gems in %s: %s.' % (field, action[field]))
+        return _encode_action(action)
+    except (KeyError, TypeError, AttributeError, IndexError) as e:
+        raise ValueError('Malformed action: %r.' % (e,))
+
+#Encode an action known to be well-formed (e.g. one from getLegalActions), without checking it.
+def _encode_action(action):
+    code = ACTION_TYPE_IDS[action['type']]
+    if 'card' in action:
+        code |= (CARD_IDS[action['card'].code]+1) << CARD_SHIFT
+    if action['noble']:
+        code |= (NOBLE_IDS[action['noble'][0]]+1) << NOBLE_SHIFT
+    for colour,count in action.get('collected_gems', {}).items():
+        code |= count << COLLECTED_SHIFTS[colour]
+    for colour,count in action.get('returned_gems', {}).items():
+        code |= count << RETURNED_SHIFTS[colour]
+    return code
+
+#Decode an int from encode_action back into an action, in the same form as those from getLegalActions.
+def decode_action(code):
+    code = int(code)
+    action_type = ACTION_TYPES[code & 7]
+    card_id,noble_id = (code >> CARD_SHIFT) & 127,(code >> NOBLE_SHIFT) & 15
+    action = {}
+    for field in ACTION_FIELDS[action_type]:
+        if field == 'type':
+            action[field] = action_type
+        elif field == 'card':
+            action[field] = CARD_LIST[card_id-1]
+        elif field == 'noble':
+            action[field] = NOBLES[noble_id-1] if noble_id else None
+        else:
+            shifts,mask = (COLLECTED_SHIFTS, 3) if field=='collected_gems' else (RETURNED_SHIFTS, 7)
+            counts = [(colour, (code >> shift) & mask) for colour,shift in shifts.items()]
+            action[field] = {colour:count for colour,count in counts if count}
+    return action
+
+
+#Build every combination of gems that can be returned, given an agent's current and just collected gems. Colours just
+#collected cannot be returned. Combinations are enumerated directly as multisets (dicts of colour counts). An empty list
+#means there aren't enough returnable gems, and so the collected gems are not a viable choice.
+def build_return_combos(current_gems, collected_gems):
+    num_return = sum(current_gems.values()) + sum(collected_gems.values()) - 10
+    available = [(colour,count) for colour,count in current_gems.items() if colour not in collected_gems and count]
+    combos = []
+    def build(i, remaining, combo):
+        if not remaining:
+            combos.append(dict(combo))
+        elif i < len(available):
+            colour,count = available[i]
+            for n in range(min(count, remaining), -1, -1):
+                build(i+1, remaining-n, combo+[(colour, n)] if n else combo)
+    if sum(count for _,count in available) >= num_return:
+        build(0, num_return, [])
+    return combos
+
+
 #Implements game logic.
 class SplendorGameRule(GameRule):
+    wire_format = 'Splendor.splendor_compact' #Packs states and actions for agents run in subprocesses (see worker.py).
+
     def __init__(self,num_of_agent):
         super().__init__(num_of_agent)
         #No private information: agent states are available to other agents. While upcoming cards are random, the decks
         #are still provided in the gamestate for agents to use if they want, since they are shuffled before each deal.
         self.private_information = None
 
-    # # for now the idea is to see whether the action is one of the legal action   
-    # def validAction(self, selected, all_legal_actions):
-    #     # return utils.ValidAction(m, actions)
-        
+    #Actions can be exchanged as ints (e.g. by agents, or in replays); see encode_action.
+    def encodeAction(self, action):
+        return encode_action(action)
+
+    def decodeAction(self, code):
+        return decode_action(code)
+
+    #Checks whether selected (an action, or its encoding) is one of the legal actions given, by comparing its encoding
+    #with theirs, which is cheaper than comparing actions. Malformed or tampered actions are never valid.
+    def validAction(self, selected, all_legal_actions):
+        try:
+            code = int(selected) if is_action_code(selected) else encode_action(selected)
+        except ValueError:
+            return False
+        return code in map(_encode_action, all_legal_actions)
 
     def initialGameState(self):
         return SplendorState(self.num_of_agent)
     
     def generateSuccessor(self, state, action, agent_id):
+        self._apply(state, action, agent_id, undoable=False)
+        return state
+
+    #In-place alternative to generateSuccessor for depth-first searches: mutates state by action, and returns an undo
+    #token with which undo() restores state exactly (gems, dealt cards, decks, reserves, nobles, score, passed flag and
+    #agent trace), so no copy of the state needs to be made per node.
+    def apply(self, state, action, agent_id):
+        return self._apply(state, action, agent_id, undoable=True)
+
+    def undo(self, state, token):
+        agent_id,action,score,last_action,passed,dealt,reserved,noble,zobrist = token
+        agent,board = state.agents[agent_id],state.board
+        #Reverse each step of _apply, in reverse order.
+        state.zobrist = zobrist
+        agent.agent_trace.action_reward.pop()
+        agent.score -= score
+        agent.passed = passed
+        agent.last_action = last_action
+        if noble:
+            agent.nobles.pop()
+            board.nobles.insert(*noble)
+        if 'buy' in action['type']:
+            agent.cards[action['card'].colour].pop()
+            agent.bonuses[action['card'].colour] -= 1
+            if reserved:
+                agent.cards['yellow'].insert(*reserved)
+        elif dealt:
+            agent.cards['yellow'].pop()
+        if dealt:
+            deck_id,i,card,deck_idx = dealt
+            if deck_idx is not None:
+                board.decks[deck_id].insert(deck_idx, board.dealt[deck_id][i])
+            board.dealt[deck_id][i] = card
+        for colour,count in action.get('returned_gems', {}).items():
+            agent.gems[colour] += count
+            board.gems[colour] -= count
+        for colour,count in action.get('collected_gems', {}).items():
+            board.gems[colour] += count
+            agent.gems[colour] -= count
+
+    #Replace the dealt card at board.dealt[deck_id][i]. When undoable, rather than shuffling the deck before drawing (as
+    #BoardState.deal does), draw from a random position within it, and record that position so undo() can put the card
+    #back. Both give every card in the deck an equal chance of being dealt.
+    def _redeal(self, board, deck_id, i, undoable):
+        card,deck = board.dealt[deck_id][i],board.decks[deck_id]
+        if not undoable:
+            board.dealt[deck_id][i] = board.deal(deck_id)
+            return None
+        deck_idx = random.randrange(len(deck)) if deck else None
+        board.dealt[deck_id][i] = deck.pop(deck_idx) if deck else None
+        return (deck_id, i, card, deck_idx)
+
+    def _apply(self, state, action, agent_id, undoable):
         agent,board = state.agents[agent_id],state.board
+        last_action,passed = agent.last_action,agent.passed
+        dealt,reserved,noble = None,None,None
         agent.last_action = action #Record last action such that other agents can make use of this information.
         score = 0
+        #Keep the Zobrist hash in step: xor out the keys of whatever changes, and xor in those of the new values.
+        zobrist = state.zobrist
+        gem_colours = set(action.get('collected_gems', ())) | set(action.get('returned_gems', ()))
+        h = zobrist ^ _zobrist_gems(board, agent, gem_colours)
         
         if 'card' in action:
             card = action['card']
@@ -158,7 +460,9 @@ class SplendorGameRule(GameRule):
                 #Add card to player's yellow stack.
                 for i in range(len(board.dealt[card.deck_id])):
                     if board.dealt[card.deck_id][i] and board.dealt[card.deck_id][i].code == card.code:
-                        board.dealt[card.deck_id][i] = board.deal(card.deck_id)
+                        h ^= _zobrist_slot(board, card.deck_id, i)
+                        dealt = self._redeal(board, card.deck_id, i, undoable)
+                        h ^= _zobrist_slot(board, card.deck_id, i) ^ ZOBRIST_AGENT_RESERVE[agent_id][card.code]
                         agent.cards['yellow'].append(card)
                         break
         
@@ -172,17 +476,23 @@ class SplendorGameRule(GameRule):
             if 'available' in action['type']:
                 for i in range(len(board.dealt[card.deck_id])):
                     if board.dealt[card.deck_id][i] and board.dealt[card.deck_id][i].code == card.code:                
-                        board.dealt[card.deck_id][i] = board.deal(card.deck_id)
+                        h ^= _zobrist_slot(board, card.deck_id, i)
+                        dealt = self._redeal(board, card.deck_id, i, undoable)
+                        h ^= _zobrist_slot(board, card.deck_id, i)
                         break
             #Else, agent is buying a reserved card. Remove card from player's yellow stack.
             else:
                 for i in range(len(agent.cards['yellow'])):
                     if agent.cards['yellow'][i].code == card.code:
+                        reserved = (i, agent.cards['yellow'][i])
                         del agent.cards['yellow'][i]
+                        h ^= ZOBRIST_AGENT_RESERVE[agent_id][card.code]
                         break                
             
             #Add card to player's stack of matching colour, and increment agent's score accordingly.
             agent.cards[card.colour].append(card)
+            agent.bonuses[card.colour] += 1
+            h ^= ZOBRIST_AGENT_CARDS[agent_id][card.code]
             score += card.points
             
         if action['noble']:
@@ -191,16 +501,21 @@ class SplendorGameRule(GameRule):
             #Add noble's points to agent score.
             for i in range(len(board.nobles)):
                 if board.nobles[i][0] == action['noble'][0]:
+                    noble = (i, board.nobles[i])
                     del board.nobles[i]
                     agent.nobles.append(action['noble'])
+                    h ^= ZOBRIST_BOARD_NOBLES[noble[1][0]] ^ ZOBRIST_AGENT_NOBLES[agent_id][noble[1][0]]
                     score += 3
                     break
                 
-        #Log this turn's action and any resultant score. Return updated gamestate.
+        #Log this turn's action and any resultant score. Return what undo() needs to reverse this action, if asked.
         agent.agent_trace.action_reward.append((action,score))
+        h ^= ZOBRIST_AGENT_SCORE[agent_id][agent.score] ^ ZOBRIST_AGENT_SCORE[agent_id][agent.score+score]
         agent.score += score
         agent.passed = action['type']=='pass'
-        return state
+        state.zobrist = h ^ _zobrist_gems(board, agent, gem_colours)
+        if undoable:
+            return (agent_id, action, score, last_action, passed, dealt, reserved, noble, zobrist)
 
     #Game ends if any agent possesses at least 15 points, and all agents have gone in this round. As a very rare edge
     #case, poor playing agents might encounter a game where none are able to proceed. Game also ends in this case.
@@ -232,32 +547,17 @@ class SplendorGameRule(GameRule):
     #Agents are disallowed from returning gems of the same colour as those they've just picked up. Since collected_gems
     #is sampled exhaustively, this function simply needs to screen out colours in collected_gems, in order for agents
     #to be given all collected/returned combinations permissible.
+    #Combinations depend only on the gem counts involved, so each is built once and memoised in RETURN_COMBOS, keyed on
+    #the (current gems, collected gems) counts.
     def generate_return_combos(self, current_gems, collected_gems):
         total_gem_count = sum(current_gems.values()) + sum(collected_gems.values())
         if total_gem_count > 10:
-            return_combos = []
-            num_return = total_gem_count - 10
-            #Combine current and collected gems. Screen out gem colours that were just collected.
-            total_gems = {i: current_gems.get(i, 0) + collected_gems.get(i, 0) for i in set(current_gems)}
-            total_gems = {i[0]:i[1] for i in total_gems.items() if i[0] not in collected_gems.keys()}.items()
-            #Form a total gems list (with elements == gem colours, and len == number of gems).
-            total_gems_list = []                    
-            for colour,count in total_gems:
-                for _ in range(count):
-                    total_gems_list.append(colour)
-            #If, after screening, there aren't enough gems that can be returned, return an empty list, indicating that 
-            #the collected_gems combination is not viable.
-            if len(total_gems_list) < num_return:
-                return []     
-            #Else, find all valid combinations of gems to return.               
-            for combo in set(itertools.combinations(total_gems_list, num_return)):
-                returned_gems = {c:0 for c in COLOURS.values()}
-                for colour in combo:
-                    returned_gems[colour] += 1
-                #Filter out colours with zero gems, and append.
-                return_combos.append(dict({i for i in returned_gems.items() if i[-1]>0}))
-                
-            return return_combos
+            key = (tuple(current_gems.items()), tuple(collected_gems.items()))
+            combos = RETURN_COMBOS.get(key)
+            if combos is None:
+                combos = RETURN_COMBOS[key] = build_return_combos(current_gems, collected_gems)
+            #Hand out copies, since these become part of actions that agents may modify.
+            return [combo.copy() for combo in combos]
         
         return [{}] #If no gems need to be returned, return a list comprised of one empty combo.
 
@@ -268,7 +568,7 @@ class SplendorGameRule(GameRule):
         return_combo = {c:0 for c in COLOURS.values()}
         for colour,cost in costs.items():
             #If a shortfall is found, see if the difference can be made with wild/seal/yellow gems.
-            available = agent.gems[colour] + len(agent.cards[colour])
+            available = agent.gems[colour] + agent.bonuses[colour]
             shortfall = max(cost - available, 0) #Shortfall shouldn't be negative.
             wild -= shortfall
             #If wilds are expended, the agent cannot make the purchase.
@@ -278,7 +578,7 @@ class SplendorGameRule(GameRule):
             #to pay using its card stacks, and should never return wilds if it can return coloured gems instead. 
             #Although there may be strategic instances where holding on to coloured gems is beneficial (by virtue of 
             #shorting players from resources), in this implementation, this edge case is not worth added complexity.
-            gem_cost                = max(cost - len(agent.cards[colour]), 0) #Gems owed.
+            gem_cost                = max(cost - agent.bonuses[colour], 0)    #Gems owed.
             gem_shortfall           = max(gem_cost - agent.gems[colour], 0)   #Wilds required.
             return_combo[colour]    = gem_cost - gem_shortfall                #Coloured gems to be returned.
             return_combo['yellow'] += gem_shortfall                           #Wilds to be returned.
@@ -286,17 +586,36 @@ class SplendorGameRule(GameRule):
         #Filter out unnecessary colours and return dict specifying combination of gems.
         return dict({i for i in return_combo.items() if i[-1]>0})
 
-    #Checks whether a particular noble is a candidate for visiting this agent.
-    def noble_visit(self, agent, noble):
+    #Checks whether a particular noble is a candidate for visiting this agent. If extra_colour is given, the agent is
+    #treated as holding one more card of that colour (i.e. the card it is about to buy).
+    def noble_visit(self, agent, noble, extra_colour=None):
         _,costs = noble
         for colour,cost in costs.items():
-            if not len(agent.cards[colour]) >= cost:
+            if agent.bonuses[colour] + (colour==extra_colour) < cost:
                 return False
         return True
 
     def getLegalActions(self, game_state, agent_id):
-        actions = []
+        return list(self.iterLegalActions(game_state, agent_id))
+
+    #Boolean array over Splendor's fixed action space (see splendor_action_space), marking the legal actions. The action
+    #space is imported here, rather than with the model, as it needs numpy, which the game itself doesn't.
+    def legalMask(self, game_state, agent_id):
+        from Splendor.splendor_action_space import legal_mask, state_slots
+        return legal_mask(self.getLegalActions(game_state, agent_id), state_slots(game_state, agent_id))
+
+    #Checks whether the agent has at least one legal action of the given type, generating no more actions than needed.
+    def hasLegalAction(self, game_state, agent_id, action_type):
+        return next(self.iterLegalActions(game_state, agent_id, (action_type,)), None) is not None
+
+    #Yields the actions of getLegalActions lazily, in the same order. If types is given, only actions of those types
+    #('collect_diff', 'collect_same', 'reserve', 'buy_available', 'buy_reserve') are generated, and the remaining action
+    #families are skipped entirely. The pass fallback is only considered when all types are requested. The state must
+    #not be modified until iteration is finished.
+    def iterLegalActions(self, game_state, agent_id, types=None):
         agent,board = game_state.agents[agent_id], game_state.board
+        wanted = lambda action_type : types is None or action_type in types
+        generated = False
 
         
         #A given turn consists of the following:
@@ -328,65 +647,70 @@ class SplendorGameRule(GameRule):
             potential_nobles = [None]
         
         #Generate actions (collect up to 3 different gems). Work out all legal combinations. Theoretical max is 10.
-        available_colours = [colour for colour,number in board.gems.items() if colour!='yellow' and number>0]
-        num_holding_gem = sum(agent.gems.values())
-        if num_holding_gem <=7 :
-            min_comb_len = min(3,len(available_colours))
+        if wanted('collect_diff'):
+            available_colours = [colour for colour,number in board.gems.items() if colour!='yellow' and number>0]
+            num_holding_gem = sum(agent.gems.values())
+            if num_holding_gem <=7 :
+                min_comb_len = min(3,len(available_colours))
 
-        elif num_holding_gem == 8:
-            min_comb_len = min(2,len(available_colours))
-        else:
-            min_comb_len = min(1,len(available_colours))
-
-        for combo_length in range(min_comb_len, min(len(available_colours), 3) + 1):
-            for combo in itertools.combinations(available_colours, combo_length):
-                collected_gems = {colour:1 for colour in combo}
-                # make sure there is no action that collect empty gem
-                if not collected_gems == {}:
-                    #Find combos of gems to return, if any. Since the max to be returned can be 3, theoretical max 
-                    #combinations will be 51, and max actions generated by the end of this stage will be 510. 
-                    #Handling this branching factor properly will be crucial for agent performance.
-                    #If return_combos comes back False, then taking these gems is invalid and won't be added.
-                    return_combos = self.generate_return_combos(agent.gems, collected_gems)
-                    for returned_gems in return_combos:
-                        for noble in potential_nobles:
-                            actions.append({'type': 'collect_diff',
-                                            'collected_gems': collected_gems,
-                                            'returned_gems': returned_gems,
-                                            'noble': noble})
+            elif num_holding_gem == 8:
+                min_comb_len = min(2,len(available_colours))
+            else:
+                min_comb_len = min(1,len(available_colours))
+
+            for combo_length in range(min_comb_len, min(len(available_colours), 3) + 1):
+                for combo in itertools.combinations(available_colours, combo_length):
+                    collected_gems = {colour:1 for colour in combo}
+                    # make sure there is no action that collect empty gem
+                    if not collected_gems == {}:
+                        #Find combos of gems to return, if any. Since the max to be returned can be 3, theoretical max 
+                        #combinations will be 51, and max actions generated by the end of this stage will be 510. 
+                        #Handling this branching factor properly will be crucial for agent performance.
+                        #If return_combos comes back False, then taking these gems is invalid and won't be added.
+                        return_combos = self.generate_return_combos(agent.gems, collected_gems)
+                        for returned_gems in return_combos:
+                            for noble in potential_nobles:
+                                generated = True
+                                yield {'type': 'collect_diff',
+                                       'collected_gems': collected_gems,
+                                       'returned_gems': returned_gems,
+                                       'noble': noble}
         
         #Generate actions (collect 2 identical gems). Theoretical max is 5.
-        available_colours = [colour for colour,number in board.gems.items() if colour!='yellow' and number>=4]
-        for colour in available_colours:
-            collected_gems = {colour:2}
-            
-            #Like before, find combos to return, if any. Since the max to be returned is now 2, theoretical max 
-            #combinations will be 21, and max actions generated here will be 105.
-            return_combos = self.generate_return_combos(agent.gems, collected_gems)
-            for returned_gems in return_combos:
-                for noble in potential_nobles:
-                    actions.append({'type': 'collect_same',
-                                    'collected_gems': collected_gems,
-                                    'returned_gems': returned_gems,
-                                    'noble': noble})  
+        if wanted('collect_same'):
+            available_colours = [colour for colour,number in board.gems.items() if colour!='yellow' and number>=4]
+            for colour in available_colours:
+                collected_gems = {colour:2}
+                
+                #Like before, find combos to return, if any. Since the max to be returned is now 2, theoretical max 
+                #combinations will be 21, and max actions generated here will be 105.
+                return_combos = self.generate_return_combos(agent.gems, collected_gems)
+                for returned_gems in return_combos:
+                    for noble in potential_nobles:
+                        generated = True
+                        yield {'type': 'collect_same',
+                               'collected_gems': collected_gems,
+                               'returned_gems': returned_gems,
+                               'noble': noble}
 
         #Generate actions (reserve card). Agent can reserve only if it possesses < 3 cards currently reserved.
         #With a reservation, the agent will receive one seal (yellow), if there are any left. Reservations are stored
         #and displayed under the agent's yellow stack, as they won't generate their true colour until fully purchased.
         #There is a possible 12 cards to be reserved, and if the agent goes over limit, there are max 6 gem colours
         #that can be returned, leading to a theoretical max of 72 actions here.
-        if len(agent.cards['yellow']) < 3:
+        if wanted('reserve') and len(agent.cards['yellow']) < 3:
             collected_gems = {'yellow':1} if board.gems['yellow']>0 else {}
             return_combos = self.generate_return_combos(agent.gems, collected_gems)
             for returned_gems in return_combos:
                 for card in board.dealt_list():
                     if card:
                         for noble in potential_nobles:
-                            actions.append({'type': 'reserve',
-                                            'card': card,
-                                            'collected_gems': collected_gems,
-                                            'returned_gems': returned_gems,
-                                            'noble': noble})
+                            generated = True
+                            yield {'type': 'reserve',
+                                   'card': card,
+                                   'collected_gems': collected_gems,
+                                   'returned_gems': returned_gems,
+                                   'noble': noble}
             
         #Generate actions (buy card). Agents can buy cards if they can cover its resource cost. Resources can come from
         #an agent's gem and card stacks. Card stacks represent gem factories, or 'permanent gems'; if there are 2 blue 
@@ -398,35 +722,33 @@ class SplendorGameRule(GameRule):
         #There is a max 15 actions that can be generated here (15 possible cards to be bought: 12 dealt + 3 reserved).
         #However, in the case that multiple nobles are made candidates for visiting with this move, this number will
         #be multiplied accordingly. This however, is a rare event.
-        for card in board.dealt_list() + agent.cards['yellow']:
-            if not card or len(agent.cards[card.colour]) == 7:
+        buyable = (board.dealt_list() if wanted('buy_available') else []) + \
+                  (agent.cards['yellow'] if wanted('buy_reserve') else [])
+        for card in buyable:
+            if not card or agent.bonuses[card.colour] == 7:
                 continue
             returned_gems = self.resources_sufficient(agent, card.cost) #Check if this card is affordable.
             if type(returned_gems)==dict: #If a dict was returned, this means the agent possesses sufficient resources.
                 #Check to see if the acquisition of a new card has meant new nobles becoming candidates to visit.
+                #The agent is credited with this card's colour for the check, rather than being copied and given the card.
                 new_nobles = []
                 for noble in board.nobles:
-                    agent_post_action = copy.deepcopy(agent)
-                    #Give the card featured in this action to a copy of the agent.
-                    agent_post_action.cards[card.colour].append(card)
-                    #Use this copied agent to check whether this noble can visit.
-                    if self.noble_visit(agent_post_action, noble):
+                    if self.noble_visit(agent, noble, card.colour):
                         new_nobles.append(noble) #If so, add noble to the new list.
                 if not new_nobles:
                     new_nobles = [None]
                 for noble in new_nobles:
-                    actions.append({'type': 'buy_reserve' if card in agent.cards['yellow'] else 'buy_available',
-                                    'card': card,
-                                    'returned_gems': returned_gems,
-                                    'noble': noble})
+                    generated = True
+                    yield {'type': 'buy_reserve' if card in agent.cards['yellow'] else 'buy_available',
+                           'card': card,
+                           'returned_gems': returned_gems,
+                           'noble': noble}
         
-        #Return list of actions. If there are no actions (almost impossible), all this player can do is pass.
+        #If there are no actions (almost impossible), all this player can do is pass.
         #A noble is still permitted to visit if conditions are met.
-        if not actions:
+        if not generated and types is None:
             for noble in potential_nobles:
-                actions.append({'type': 'pass', 'noble':noble})
-                
-        return actions
+                yield {'type': 'pass', 'noble':noble}
 
 
 # END FILE -----------------------------------------------------------------------------------------------------------#
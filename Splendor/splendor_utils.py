@@ -118,6 +118,12 @@ NOBLES = [('4g4r', {'green': 4, 'red': 4}),
 COLOURS = {'B':'black', 'r':'red', 'y':'yellow', 'g':'green', 'b':'blue', 'w':'white'}
 
 
+#Integer IDs for cards and nobles (their positions in CARDS and NOBLES), for compact representations of the game.
+CARD_CODES = list(CARDS.keys())
+CARD_IDS   = {code:i for i,code in enumerate(CARD_CODES)}
+NOBLE_IDS  = {code:i for i,(code,_) in enumerate(NOBLES)}
+
+
 # CLASS DEF ----------------------------------------------------------------------------------------------------------#
 
 
@@ -139,6 +145,11 @@ class AgentTrace:
     def __init__(self, pid):
         self.id = pid
         self.action_reward = [] # Turn-by-turn history consisting of (action,reward) tuples.
+
+    def clone(self):
+        trace = AgentTrace(self.id)
+        trace.action_reward = list(self.action_reward) # Entries are never modified once logged, so may be shared.
+        return trace
     
 def GemsToString(gem_dict):
     gem_counts = list(gem_dict.items())
@@ -51,7 +51,7 @@ def evaluate_gemcolor_weight(gems, self_cards, dealt_cards):
     return gem_weight, self_cards_counts
         
 def evaluate_player_score(game_rule, game_state, player_id):
-    current_state = deepcopy(game_state)
+    current_state = game_state.clone()
     point_weight = POINT_WEIGHT
     reserved_weight = RESERVED_WEIGHT
     
@@ -84,7 +84,7 @@ def SelectAction_v1(game_rule, actions, game_state, current_player_id):
         if gemNum > MAX_GEM - 3:
             if action["type"] in GEM_ACTION_TYPE:
                 continue
-        current_state = deepcopy(game_state)
+        current_state = game_state.clone()
         current_state = game_rule.generateSuccessor(current_state, action, current_player_id)
         score_improve = evaluate_player_score(game_rule, current_state, current_player_id)[0] - current_score
         if score_improve > mx_score:
@@ -142,7 +142,7 @@ class Node:
     
     def expand(self):
         best_action = self.untried_moves.pop(0)
-        current_state = deepcopy(self.state)
+        current_state = self.state.clone()
         next_state = self.game_rule.generateSuccessor(current_state, best_action, self.id)
         next_action_agent_id = 1 - self.id 
         new_node = Node(next_state, best_action, self, next_action_agent_id)
@@ -151,7 +151,9 @@ class Node:
 
     def getStrategicActions(self, game_state):
         gemNum = sum(game_state.agents[self.id].gems.values())
-        legalActions = self.game_rule.getLegalActions(game_state, self.id)
+        # Collect actions are only wanted while there is room for 3 more gems, so skip generating them otherwise
+        types = BUY_ACTION_TYPE + [RESERVE_ACTION_TYPE] + (GEM_ACTION_TYPE if gemNum <= MAX_GEM - 3 else [])
+        legalActions = list(self.game_rule.iterLegalActions(game_state, self.id, types))
         sorted_actions = []
         buy_actions = [action for action in legalActions if action["type"] in BUY_ACTION_TYPE]
         if len(buy_actions) > 0:
@@ -212,7 +214,7 @@ class MCTS:
             return node
 
     def simulate(self, node, startTime):
-        current_state = deepcopy(node.state)
+        current_state = node.state.clone()
         current_player_id = node.id
         depth = 0
         
@@ -1,7 +1,7 @@
 from template import Agent
-from Splendor.splendor_model import SplendorGameRule
+from Splendor.splendor_model import SplendorGameRule, ZOBRIST_TO_MOVE
+from transposition import TranspositionTable, bound_flag, EXACT, MOVE
 from collections import deque
-from copy import deepcopy
 import copy
 import random
 import time
@@ -97,6 +97,8 @@ class myAgent(Agent):
     def __init__(self,_id):
         super().__init__(_id)
         self.game_rule = SplendorGameRule(num_of_agent=2)
+        # kept across turns, so later turns can reuse the subtrees already searched
+        self.tt = TranspositionTable()
 
     def haveTime(self):
         """ Check if there's still time left for the agent to think. """
@@ -333,6 +335,7 @@ class myAgent(Agent):
     def SelectAction(self, actions, game_state):
         """ Select the best action based on minimax algorithm within time constraints. """
         self.startTime = time.time()
+        self.tt.new_search()
         best_action = None
         depth_reached = 0
         for depth in range(1, MAX_DEPTH + 1):
@@ -352,38 +355,70 @@ class myAgent(Agent):
     def minimax_decision(self, game_state, depth):
         """ Decide the best action using the minimax algorithm with alpha-beta pruning. """
 
+        # every leaf of this iteration is scaled by the same decay factor, so table values are stored divided by it,
+        # and can be shared between iterations of different depths
+        scale = 0.9 ** depth
+
+        def ordered_actions(state, agent_id, best_move):
+            actions = self.get_strategicActions(state, agent_id)
+            # try the best move found by an earlier search first
+            if best_move is not None and best_move in actions:
+                actions.remove(best_move)
+                actions.insert(0, best_move)
+            return actions
+
         def max_value(state, agent_id, current_depth, alpha, beta):
             if current_depth == 0:
                 return self.evaluate_state(state, depth=depth)
+            # the state hash doesn't change with the side to move during the search, so mix it in here
+            key = state.zobrist ^ ZOBRIST_TO_MOVE[agent_id]
+            value, alpha, beta, best_move = self.tt.probe(key, current_depth, alpha, beta, scale)
+            if value is not None:
+                return value
+            alpha_orig = alpha
             
             max_eval = NEG_INFINITY
-            actions = self.get_strategicActions(state, agent_id)
+            actions = ordered_actions(state, agent_id, best_move)
             for action in actions:
                 if not self.haveTime():
                     break
-                successor_state = self.game_rule.generateSuccessor(deepcopy(state), action, agent_id)
-                eval_score = min_value(successor_state, opponent_id, current_depth-1, alpha, beta)
-                max_eval = max(max_eval, eval_score)
+                # walk the tree in place, restoring the state after each child is searched
+                undo_token = self.game_rule.apply(state, action, agent_id)
+                eval_score = min_value(state, opponent_id, current_depth-1, alpha, beta)
+                self.game_rule.undo(state, undo_token)
+                if eval_score > max_eval:
+                    max_eval, best_move = eval_score, action
                 alpha = max(alpha, eval_score)
                 if beta <= alpha:
                     break
+            # results cut short by the time limit are incomplete, so aren't stored
+            if self.haveTime():
+                self.tt.store(key, current_depth, max_eval / scale, bound_flag(max_eval, alpha_orig, beta), best_move)
             return max_eval
 
         def min_value(state, agent_id, current_depth, alpha, beta):
             if current_depth == 0:
                 return self.evaluate_state(state, depth=depth)
+            key = state.zobrist ^ ZOBRIST_TO_MOVE[agent_id]
+            value, alpha, beta, best_move = self.tt.probe(key, current_depth, alpha, beta, scale)
+            if value is not None:
+                return value
+            beta_orig = beta
             min_eval = POS_INFINITY
-            actions = self.get_strategicActions(state, agent_id)
+            actions = ordered_actions(state, agent_id, best_move)
             for action in actions:
                 if not self.haveTime():
                     break
-                successor_state = self.game_rule.generateSuccessor(deepcopy(state), action, agent_id)
-                eval_score = max_value(successor_state, self.id, current_depth-1, alpha, beta)
-                min_eval = min(min_eval, eval_score)
+                undo_token = self.game_rule.apply(state, action, agent_id)
+                eval_score = max_value(state, self.id, current_depth-1, alpha, beta)
+                self.game_rule.undo(state, undo_token)
+                if eval_score < min_eval:
+                    min_eval, best_move = eval_score, action
                 beta = min(beta, eval_score)
                 if beta <= alpha:
                     break
-    
+            if self.haveTime():
+                self.tt.store(key, current_depth, min_eval / scale, bound_flag(min_eval, alpha, beta_orig), best_move)
             return min_eval
         
         # print(f"Starting minimax decision for depth: {depth}")
@@ -391,7 +426,11 @@ class myAgent(Agent):
         opponent_id = 1 - agent_id
         best_action = None
         best_eval = NEG_INFINITY
-        actions = self.get_strategicActions(game_state, agent_id)
+        # search on a private copy, which apply/undo modify in place
+        state = game_state.clone()
+        root_key = state.zobrist ^ ZOBRIST_TO_MOVE[agent_id]
+        root_entry = self.tt.lookup(root_key)
+        actions = ordered_actions(state, agent_id, root_entry[MOVE] if root_entry else None)
         # print(actions)
         numActions = len(actions)
         count = 0
@@ -400,9 +439,13 @@ class myAgent(Agent):
             print(f"Evaluating action {count}/{numActions}: {action}")
             if not self.haveTime():
                 break
-            successor_state = self.game_rule.generateSuccessor(deepcopy(game_state), action, agent_id)
-            eval_score = min_value(successor_state, opponent_id, current_depth=depth-1, alpha = NEG_INFINITY, beta=POS_INFINITY)
+            undo_token = self.game_rule.apply(state, action, agent_id)
+            eval_score = min_value(state, opponent_id, current_depth=depth-1, alpha = NEG_INFINITY, beta=POS_INFINITY)
+            self.game_rule.undo(state, undo_token)
             if eval_score > best_eval:
                 best_eval = eval_score
                 best_action = action
+        # every root action is searched with a full window, so the root value is exact
+        if self.haveTime() and best_action is not None:
+            self.tt.store(root_key, depth, best_eval / scale, EXACT, best_action)
         return best_action
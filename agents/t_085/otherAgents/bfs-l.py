@@ -1,7 +1,6 @@
 from template import Agent
 from Splendor.splendor_utils import *
 import random
-from copy import deepcopy
 import time
 from collections import deque
 from Splendor.splendor_model import SplendorGameRule
@@ -19,19 +18,14 @@ class myAgent(object):
     # a copy of the current game state (including that of the agent),
     # select one of the actions to execute. 
     def ifCanBuy(self, game_state):
-        actions = self.game_rule.getLegalActions(game_state, self.id)
-        for action in actions:
-            if action["type"] == 'buy_available':
-                return True
-        return False
+        return self.game_rule.hasLegalAction(game_state, self.id, 'buy_available')
     
     def gemAction(self, game_state):
-        actions = self.game_rule.getLegalActions(game_state, self.id)
         filter_gem_actions = []
-        gem_actions = [action for action in actions if action["type"] == 'collect_diff' or action["type"] == 'collectd_gems']
+        gem_actions = list(self.game_rule.iterLegalActions(game_state, self.id, ('collect_diff',)))
         if (gem_actions):
             for action in gem_actions:
-                next_state = self.game_rule.generateSuccessor(deepcopy(game_state), action, self.id)
+                next_state = self.game_rule.generateSuccessor(game_state.clone(), action, self.id)
                 if(self.ifCanBuy(next_state)):
                     filter_gem_actions.append(action)
             if (filter_gem_actions):
@@ -69,7 +63,7 @@ class myAgent(object):
         startTime = time.time()
         path = []
         new_actions = []
-        queue = deque([(deepcopy(game_state), path)])
+        queue = deque([(game_state.clone(), path)])
         originScore = self.game_rule.calScore(game_state, self.id)
         while(len(queue) > 0 and time.time() - startTime < Max_Time):
             state, path = queue.popleft()
@@ -92,7 +86,7 @@ class myAgent(object):
         elif actionType == "reserve":
             actions = [actions[0]]
         for action in actions:
-            next_state = self.game_rule.generateSuccessor(deepcopy(state), action, self.id)
+            next_state = self.game_rule.generateSuccessor(state.clone(), action, self.id)
             next_path = path + [action]
             queue.append((next_state, next_path))
             return
@@ -75,11 +75,7 @@ class myAgent(Agent):
     # a copy of the current game state (including that of the agent),
     # select one of the actions to execute. 
     def ifCanBuy(self, game_state):
-        actions = self.game_rule.getLegalActions(game_state, self.id)
-        for action in actions:
-            if action["type"] == 'buy_available':
-                return True
-        return False
+        return self.game_rule.hasLegalAction(game_state, self.id, 'buy_available')
     # This gemAction is from leung's bfs
     # to only keep the gem actions that will make the next buy possible
     def get_strategicGemActions(self, game_state, gem_actions, agent_id):
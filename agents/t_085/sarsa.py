@@ -1,7 +1,6 @@
 from template import Agent
 from Splendor.splendor_utils import *
 import random
-from copy import deepcopy
 import time
 from collections import deque
 from Splendor.splendor_model import SplendorGameRule
@@ -16,13 +15,6 @@ MAX_TIME = 0.3
 # Program mode
 TRAINING = False
 PATH = "agents/t_085/weight.json"
-LEVEL_1_CARDS = ['1g1w1r1b', '1g1w1r2b', '2b1r2w', '2g1r', '2w2g', '3g', '3r1B1g', '4b', '1r1w1B1g', '1w2B', '2g2B', '2g2r1w', '2r1w1B1g', '3B', '3g1r1b', '4r', '1r1w1B1b',
-                  '1r1w2B1b', '2b2r', '2r2B1b', '2w1b', '3b1g1w', '3r', '4B', '1g1w1B1b', '1g2B2w', '1g2w1B1b', '1r3B1w', '2b1g', '2w2r', '3w', '4w', '1b1B3w', '1r1b1B1g',
-                    '1r1b1B2g', '2b2B', '2g1B2b', '2r1B', '3b', '4g']
-LEVEL_2_CARDS = ['2b2g3w', '3g2B3w', '4g2r1b', '5g3r', '5w', '6B', '1r4B2w', '2g3r2b', '3g3B2b', '5b', '5w3b', '6b', '2b1B4w', '2g3r3w', '3b2B2w', '5b3g', '5g', '6g',
-                  '2r3B2w', '2r3B3b', '3w5B', '4b2g1w', '5B', '6r', '2r2B3g', '3b3r2w', '4r2B1g', '5r', '5r3B', '6w']
-LEVEL_3_CARDS = ['5g3w3r3b', '6r3B3g', '7r', '7r3B', '3b3B6w', '3r3w5B3g', '7w', '7w3b', '3r5w3B3b', '6b3g3w', '7b', '7b3g', '3g3w3B5b', '6g3r3b', '7g', '7g3r',
-                  '3r6B3w', '3w7B', '5r3b3B3g', '7B']
 
 class myAgent(object):
     def __init__(self, _id):
@@ -44,19 +36,14 @@ class myAgent(object):
     # a copy of the current game state (including that of the agent),
     # select one of the actions to execute. 
     def ifCanBuy(self, game_state):
-        actions = self.game_rule.getLegalActions(game_state, self.id)
-        for action in actions:
-            if action["type"] == 'buy_available':
-                return True
-        return False
+        return self.game_rule.hasLegalAction(game_state, self.id, 'buy_available')
     
     def gemAction(self, game_state):
-        actions = self.game_rule.getLegalActions(game_state, self.id)
         filter_gem_actions = []
-        gem_actions = [action for action in actions if action["type"] == 'collect_diff' or action["type"] == 'collectd_gems']
+        gem_actions = list(self.game_rule.iterLegalActions(game_state, self.id, ('collect_diff',)))
         if (gem_actions):
             for action in gem_actions:
-                next_state = self.game_rule.generateSuccessor(deepcopy(game_state), action, self.id)
+                next_state = self.game_rule.generateSuccessor(game_state.clone(), action, self.id)
                 if(self.ifCanBuy(next_state)):
                     filter_gem_actions.append(action)
             if (filter_gem_actions):
@@ -115,7 +102,7 @@ class myAgent(object):
             if random.random() < self.epsilon:
                 new_actions = self.greedyAction(game_state, actions)
                 new_action = random.choice(new_actions)
-                next_state = self.game_rule.generateSuccessor(deepcopy(game_state), new_action, self.id)
+                next_state = self.game_rule.generateSuccessor(game_state.clone(), new_action, self.id)
                 reward = self.calReward(game_state, next_state, new_action)
                 next_path = path + [new_action]
                 self.updateAll(game_state, next_state, new_action, reward)
@@ -123,7 +110,7 @@ class myAgent(object):
             else:
                 new_action = random.choice(actions)
                 next_path = path + [new_action] 
-                next_state = self.game_rule.generateSuccessor(deepcopy(game_state), new_action, self.id)
+                next_state = self.game_rule.generateSuccessor(game_state.clone(), new_action, self.id)
                 new_path = self.train(next_state, startTime, next_path)
         return new_path if new_path else path
     
@@ -137,7 +124,11 @@ class myAgent(object):
             gradient = feature_value * delta
             self.weight[feature] = old_weight + gradient
         self.lr = max(0.0001, self.lr * 0.9)
-        json.dump(self.weight, open(PATH, "w"))
+
+    # Save the weights learned during the game once it's over, rather than after every update.
+    def on_game_end(self, game_state, scores):
+        if TRAINING:
+            json.dump(self.weight, open(PATH, "w"))
     
     def getQ(self, game_state, action):
         sum = 0
@@ -155,20 +146,14 @@ class myAgent(object):
         if 'card' in action:
             feature['card_point'] = action['card'].points
             feature['card_cost'] = - sum(action['card'].cost.values())
-        count1 = 0
-        count2 = 0
-        count3 = 0
+        # count cards by level (deck_id is the card's level, 0 to 2)
+        counts = [0, 0, 0]
         for key, items in game_state.agents[self.id].cards.items():
             for card in items:
-                if card.code in LEVEL_1_CARDS:
-                    count1 += 1
-                if card.code in LEVEL_2_CARDS:
-                    count2 += 1
-                if card.code in LEVEL_3_CARDS:
-                    count3 += 1
-        feature['level_1_cards'] = count1
-        feature['level_2_cards'] = count2
-        feature['level_3_cards'] = count3
+                counts[card.deck_id] += 1
+        feature['level_1_cards'] = counts[0]
+        feature['level_2_cards'] = counts[1]
+        feature['level_3_cards'] = counts[2]
         return feature
     
     #reward for different outcomes, range 0 to 1
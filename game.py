@@ -6,18 +6,48 @@
 
 # IMPORTS ------------------------------------------------------------------------------------------------------------#
 
-import random, copy, time
+import random, copy, time, base64, importlib, numbers
 from   template     import GameState
-from   func_timeout import func_timeout, FunctionTimedOut
 from   template     import Agent as DummyAgent
+from   snapshot     import freeze, thaw
+from   worker       import AgentWorker
     
 # CONSTANTS ----------------------------------------------------------------------------------------------------------#
 
-FREEDOM = False  #Whether or not to penalise agents for incorrect moves and timeouts. Useful for debugging.
-WARMUP  = 15    #Warmup period (time given to each agent on their first turn).
+FREEDOM   = False #Whether or not to penalise agents for incorrect moves and timeouts. Useful for debugging.
+WARMUP    = 15    #Warmup period (time given to each agent on their first turn).
+SNAPSHOTS = True  #Whether to hand agents read-only views (see snapshot.py) of states without clone(), rather than copies.
+#Engine calls counted with count_calls: for making successors and for generating actions, the first method of each
+#group the game rule has. Splendor's generateSuccessor and apply both go through _apply, and getLegalActions and
+#hasLegalAction through iterLegalActions, so counting those counts every way of searching once.
+COUNTED_CALLS = [('_apply', 'generateSuccessor'), ('iterLegalActions', 'getLegalActions')]
 
 # CLASS DEF ----------------------------------------------------------------------------------------------------------#
 
+#Counts calls to methods of a class, made through any instance (e.g. by agents' own copies of a game rule), by wrapping
+#them until remove() is called. Calls made in other processes, such as sandboxed agents', go uncounted.
+class CallCounter:
+    def __init__(self, cls, names):
+        self.cls = cls
+        self.counts = dict.fromkeys(names, 0)
+        self.originals = {name:cls.__dict__.get(name) for name in names}
+        for name in names:
+            setattr(cls, name, self._wrap(name, getattr(cls, name)))
+
+    def _wrap(self, name, method):
+        def counted(*args, **kwargs):
+            self.counts[name] += 1
+            return method(*args, **kwargs)
+        return counted
+
+    def remove(self):
+        for name,method in self.originals.items():
+            if method is None:
+                delattr(self.cls, name)
+            else:
+                setattr(self.cls, name, method)
+
+
 class Game:
     def __init__(self, GameRule,
                  agent_list, 
@@ -27,7 +57,10 @@ class Game:
                  warning_limit=3, 
                  displayer = None, 
                  agents_namelist = ["Alice","Bob"],
-                 interactive=False):
+                 interactive=False,
+                 workers=None,
+                 count_calls=False,
+                 recorder=None):
         
         self.seed = seed
         random.seed(self.seed)
@@ -63,6 +96,52 @@ class Game:
         if self.displayer is not None:
             self.displayer.InitDisplayer(self)
         self.interactive = interactive
+        self.count_calls = count_calls
+        self.recorder = recorder #Optionally, records the game as it's played (see replay.ReplayWriter).
+        #Agents select actions on persistent workers (see worker.py), one per agent. Workers can be passed in, to be
+        #reused over several games; otherwise, the game starts its own and closes them when it ends.
+        self.own_workers = workers is None
+        self.workers = [AgentWorker() for _ in agent_list] if workers is None else workers
+        for worker,agent in zip(self.workers, agent_list):
+            worker.agent = agent
+
+    #The game state as agent_index is to see it. Agents are given copies, from which private information is removed.
+    #Games that support it provide a cheap structural clone, which agents can read at full speed. Otherwise, in perfect
+    #information games, agents are handed read-only views, which cost nothing to make but slow every read; failing that,
+    #a deepcopy.
+    def _AgentView(self, game_state, agent_index):
+        if hasattr(game_state, 'clone'):
+            gs_copy = game_state.clone()
+        elif SNAPSHOTS and not self.game_rule.private_information:
+            return freeze(game_state)
+        else:
+            gs_copy = copy.deepcopy(game_state)
+        
+        # Delete all specified attributes in the agent state copies, if this isn't a perfect information game.
+        if self.game_rule.private_information:
+            delattr(gs_copy.deck, 'cards') # Upcoming cards cannot be observed.
+            for i in range(len(gs_copy.agents)):
+                if gs_copy.agents[i].id != agent_index:
+                    for attr in self.game_rule.private_information:
+                        delattr(gs_copy.agents[i], attr)
+        return gs_copy
+
+    #An agent's copy of an action, which it can keep or modify. Dict actions are copied along with the dicts in them (such
+    #as Splendor's gems), anything within those being immutable (such as Splendor's cards); other actions are deep-copied.
+    @staticmethod
+    def _ActionView(action):
+        if type(action) is not dict:
+            return copy.deepcopy(action)
+        return {key:dict(value) if type(value) is dict else value for key,value in action.items()}
+
+    #Call a lifecycle hook (on_game_start or on_game_end; see template.Agent) of each agent, on its worker, with its view
+    #of the game state. Like the agents' constructors, hooks have no time limit, and any errors they raise are ignored.
+    def _NotifyAgents(self, hook, *args):
+        for agent_index,worker in enumerate(self.workers[:len(self.agents)]):
+            try:
+                worker.notify(hook, self._AgentView(self.game_rule.current_game_state, agent_index), *args)
+            except:
+                pass
 
     def _EndGame(self,num_of_agent,history, isTimeOut = True, id = None):
         history.update({"seed":self.seed,
@@ -79,10 +158,32 @@ class Game:
 
         if self.displayer is not None:
             self.displayer.EndGame(self.game_rule.current_game_state,history["scores"])
+        if self.recorder is not None:
+            self.recorder.end(history)
+        self._NotifyAgents('on_game_end', dict(history["scores"]))
         return history
 
+    #Each move's history records how long the agent took to select it and, with count_calls, how many calls it made to
+    #the game rule meanwhile (see COUNTED_CALLS).
     def Run(self):
+        if self.count_calls:
+            cls = type(self.game_rule)
+            names = [next(name for name in group if hasattr(cls, name)) for group in COUNTED_CALLS]
+            self.counter = CallCounter(cls, names)
+        try:
+            return self._Run()
+        finally:
+            if self.count_calls:
+                self.counter.remove()
+            if self.own_workers:
+                for worker in self.workers:
+                    worker.close()
+
+    def _Run(self):
         history = {"actions":[]}
+        if self.recorder is not None:
+            self.recorder.start(self)
+        self._NotifyAgents('on_game_start')
         action_counter = 0
         while not self.game_rule.gameEnds():
             agent_index = self.game_rule.getCurrentAgentIndex()
@@ -90,32 +191,30 @@ class Game:
             game_state = self.game_rule.current_game_state
             game_state.agent_to_move = agent_index
             actions = self.game_rule.getLegalActions(game_state, agent_index)
-            actions_copy = copy.deepcopy(actions)
-            gs_copy = copy.deepcopy(game_state)
-            
-            # Delete all specified attributes in the agent state copies, if this isn't a perfect information game.
-            if self.game_rule.private_information:
-                delattr(gs_copy.deck, 'cards') # Upcoming cards cannot be observed.
-                for i in range(len(gs_copy.agents)):
-                    if gs_copy.agents[i].id != agent_index:
-                        for attr in self.game_rule.private_information:
-                            delattr(gs_copy.agents[i], attr)
+            gs_copy = self._AgentView(game_state, agent_index)
+            actions_copy = [self._ActionView(action) for action in actions]
             
             #Before updating the game, if this is the first move, allow the displayer an initial update.
             #This is used by some games to run simple pre-game animations.
             if action_counter==0 and self.displayer is not None:
                 self.displayer._DisplayState(self.game_rule.current_game_state)
                         
+            think_start = time.perf_counter()
+            if self.count_calls:
+                calls_start = dict(self.counter.counts)
+
             #If interactive mode, update displayer and obtain action via user input.
             if self.interactive and agent_index==1:
                 self.displayer._DisplayState(self.game_rule.current_game_state)
-                selected = self.displayer.user_input(actions_copy)
+                selected = thaw(self.displayer.user_input(actions_copy))
+                think_time = time.perf_counter() - think_start
                 
             else:
                 #If freedom is given to agents, let them return any action in any time period, at the risk of breaking 
                 #the simulation. This can be useful for debugging purposes.
                 if FREEDOM:
-                    selected = agent.SelectAction(actions_copy, gs_copy)
+                    selected = thaw(agent.SelectAction(actions_copy, gs_copy))
+                    think_time = time.perf_counter() - think_start
                 else:
                     #"Gamemaster" agent has an agent index equal to the number of player agents in the game.
                     #If the gamemaster acts (e.g. to start or end a round in Azul), let it do so uninhibited.
@@ -125,17 +224,25 @@ class Game:
                     #  - Illegal move checked by self.validaction(), if implemented by the game being run.
                     #  - Else, look for move in actions list by equality according to Python.
                     #If this is the agent's first turn, allow warmup time.
+                    #Actions chosen from (or assembled out of) read-only views are thawed back into the actions themselves.
                     try: 
-                        selected = func_timeout(WARMUP if action_counter < len(self.agents) else self.time_limit, 
-                                                agent.SelectAction,args=(actions_copy, gs_copy))
+                        if agent_index < len(self.agents):
+                            selected = thaw(self.workers[agent_index].select(actions_copy, gs_copy,
+                                            WARMUP if action_counter < len(self.agents) else self.time_limit))
+                        else:
+                            selected = agent.SelectAction(actions_copy, gs_copy)
                     except:
                         selected = "timeout"
-                        
+                    think_time = time.perf_counter() - think_start
+
                     if agent_index != self.game_rule.num_of_agent:
                         if selected != "timeout":
                             if self.valid_action:
                                 if not self.valid_action(selected, actions):
                                     selected = "illegal"
+                                #Games that encode actions as ints allow agents to return an encoding instead.
+                                elif is_action_code(selected) and hasattr(self.game_rule, 'decodeAction'):
+                                    selected = self.game_rule.decodeAction(selected)
                             elif not selected in actions:
                                 selected = "illegal"
                             
@@ -152,7 +259,12 @@ class Game:
                 
             random.seed(self.seed_list[self.seed_idx])
             self.seed_idx += 1
-            history["actions"].append({action_counter:{"agent_id":self.game_rule.current_agent_index,"action":selected}})
+            move = {"agent_id":self.game_rule.current_agent_index, "action":selected, "think_time":think_time}
+            if self.count_calls:
+                move["calls"] = {name:count - calls_start[name] for name,count in self.counter.counts.items()}
+            history["actions"].append({action_counter:move})
+            if self.recorder is not None:
+                self.recorder.move(move, (agent_index,action_counter) in self.warning_positions[-1:])
             action_counter += 1
             
             self.game_rule.update(selected)
@@ -173,42 +285,122 @@ class Game:
 class GameReplayer:
     def __init__(self,GameRule,replay, displayer = None):
         self.replay = replay
+        self.GameRule = GameRule
                     
         self.seed = self.replay["seed"]
-        random.seed(self.seed)
-        self.seed_list = [random.randint(0,1e10) for _ in range(1000)]
-        self.seed_idx = 0
-
         self.num_of_agent = self.replay["num_of_agent"]
         self.agents_namelist = replay["agents_namelist"]
         self.warning_limit = replay["warning_limit"]
         self.warnings = [0]*self.num_of_agent
         self.warning_positions = replay["warning_positions"]
-        self.game_rule = GameRule(self.num_of_agent)
-        self.scores=replay["scores"]
+        self._Restart()
 
         self.displayer = displayer
         if self.displayer is not None:
             self.displayer.InitDisplayer(self)           
   
+    #Set up the game as it was before the first move.
+    def _Restart(self):
+        random.seed(self.seed)
+        self.seed_list = [random.randint(0,1e10) for _ in range(1000)]
+        self.seed_idx = 0
+        self.game_rule = self.GameRule(self.num_of_agent)
+        self.move_index = 0
+
+    #Play a move of the replay, reseeding as the game did.
+    def _Play(self, info):
+        selected = info["action"]
+        agent_index = info["agent_id"]
+        #Streaming replays (see replay.py) store actions as their encodings.
+        if is_action_code(selected) and hasattr(self.game_rule, 'decodeAction'):
+            selected = self.game_rule.decodeAction(selected)
+        self.game_rule.current_agent_index = agent_index          
+
+        random.seed(self.seed_list[self.seed_idx])
+        self.seed_idx += 1
+        self.game_rule.update(selected)
+        random.seed(self.seed_list[self.seed_idx])
+        self.seed_idx += 1
+        self.move_index += 1
+        return agent_index,selected
+
+    #Bring the game to the position before move move_index (i.e. after move_index moves), and return its state. Play
+    #resumes from the nearest checkpoint at or before that position (see replay.py), or from the current position if
+    #that's nearer, or else from the start. Restored states are rebuilt from the checkpoint, as packed by the game's
+    #wire format. No displayer is updated.
+    def seek(self, move_index):
+        if not isinstance(self.replay, dict): #Streaming replays are read in full, for random access.
+            self.replay = self.replay.history()
+            self.warning_positions = self.replay["warning_positions"]
+        moves = [info for item in self.replay["actions"] for info in item.values()]
+        checkpoints = [i for i in self.replay.get("checkpoints", {}) if i <= move_index]
+        start = max(checkpoints, default=0)
+        if self.move_index > move_index or self.move_index < start:
+            if start:
+                agent_index,state = self.replay["checkpoints"][start]
+                wire = importlib.import_module(self.GameRule.wire_format)
+                state = wire.unpack_state(base64.b64decode(state))
+                #Wire formats may pack states in a form of their own (e.g. Splendor's CompactStates).
+                self.game_rule.current_game_state = state.to_state() if hasattr(state, 'to_state') else state
+                self.game_rule.current_agent_index = agent_index
+                self.game_rule.action_counter = start
+                self.seed_idx,self.move_index = 2*start,start
+            else:
+                self._Restart()
+        for info in moves[self.move_index:move_index]:
+            self._Play(info)
+        return self.game_rule.current_game_state
+
     def Run(self):
         for item in self.replay["actions"]:
             (index, info), = item.items()
-            selected = info["action"]
-            agent_index = info["agent_id"]
-            self.game_rule.current_agent_index = agent_index          
-
-            random.seed(self.seed_list[self.seed_idx])
-            self.seed_idx += 1
-            self.game_rule.update(selected)
-            random.seed(self.seed_list[self.seed_idx])
-            self.seed_idx += 1
+            agent_index,selected = self._Play(info)
             if self.displayer is not None:
                 if (agent_index,index) in self.warning_positions:
                     self.warnings[agent_index] += 1
                     self.displayer.TimeOutWarning(self,agent_index)
                 self.displayer.ExcuteAction(agent_index,selected, self.game_rule.current_game_state)
             
+        self.scores = self.replay["scores"] #Streaming replays reach the scores only at their end.
         if self.displayer is not None:
             self.displayer.EndGame(self.game_rule.current_game_state,self.scores)
-   
+
+# FUNCTIONS ----------------------------------------------------------------------------------------------------------#
+
+#Whether an action selected by an agent (or read from a replay) is an encoding of one: any integer (including numpy's),
+#but not a bool.
+def is_action_code(selected):
+    return isinstance(selected, numbers.Integral) and not isinstance(selected, bool)
+
+#Play a game between agents as quickly as possible, e.g. for self-play. There are no time limits, warnings, displayer or
+#history, and agents are handed the live game state and actions rather than copies, so they must not modify them.
+#Random numbers are seeded as in Game.Run, so a game plays out exactly as it would there. Returns (scores, moves), where
+#scores are indexed by agent, and moves is the list of (agent index, action) played if record is set, or else None.
+#Actions are recorded as encodings, for games that have them.
+def simulate(GameRule, agents, num_of_agent, seed=1, record=False):
+    random.seed(seed)
+    seed_list = [random.randint(0,1e10) for _ in range(1000)]
+    seed_idx = 0
+    game_rule = GameRule(num_of_agent)
+    gamemaster = DummyAgent(num_of_agent)
+    encode = getattr(game_rule, 'encodeAction', None)
+    moves = [] if record else None
+    while not game_rule.gameEnds():
+        agent_index = game_rule.getCurrentAgentIndex()
+        agent = agents[agent_index] if agent_index < len(agents) else gamemaster
+        game_state = game_rule.current_game_state
+        game_state.agent_to_move = agent_index
+        selected = agent.SelectAction(game_rule.getLegalActions(game_state, agent_index), game_state)
+        if is_action_code(selected) and hasattr(game_rule, 'decodeAction'):
+            selected = game_rule.decodeAction(selected)
+        if record:
+            moves.append((agent_index, encode(selected) if encode else selected))
+
+        random.seed(seed_list[seed_idx])
+        game_rule.update(selected)
+        random.seed(seed_list[seed_idx+1])
+        seed_idx += 2
+    scores = {i:game_rule.calScore(game_rule.current_game_state, i) for i in range(num_of_agent)}
+    return scores, moves
+
+# END FILE -----------------------------------------------------------------------------------------------------------#
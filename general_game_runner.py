@@ -10,22 +10,23 @@
 # IMPORTS ------------------------------------------------------------------------------------------------------------#
 
 
-from re import L
 import sys
 import os
 import importlib
 import traceback
 import datetime
 import time
-import pickle
 import random
-import git
-import shutil
-import logging
-import pytz
 import json
+from collections import deque
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor
 from template import Agent as DummyAgent
+from tournament import schedule, Standings
+from sprt import SPRT
 from game import Game, GameReplayer
+from worker import AgentWorker, ProcessWorker
+from replay import ReplayWriter, load_replay, save_pickled
 from optparse import OptionParser
 
 
@@ -37,14 +38,20 @@ DEFAULT_AGENT = "agents.generic.random"
 DEFAULT_AGENT_NAME = "default"
 # NUM_AGENTS    = 2
 GIT_TOKEN_PATH = "configs/token.txt"
-TIMEZONE = pytz.timezone('Australia/Melbourne')
+TIMEZONE = 'Australia/Melbourne'
 DATE_FORMAT = '%d/%m/%Y %H:%M:%S'  # RMIT Uni (Australia)
+WORKERS = {} #Agent workers (see worker.py), kept by each process (by pid) for all the games it plays.
+SANDBOXES = {} #As above, for agents run in subprocesses (--sandbox).
+AGENTS = {} #With --keepAgents, agents loaded by each process (by pid), by module and seat, for all the games it plays.
 
 
 # CLASS DEF ----------------------------------------------------------------------------------------------------------#
 
 
+#git, pytz, shutil and logging are only needed to fetch teams' agents (--cloud), so are imported there, keeping startup
+#quick for the many short runs that don't.
 def is_git_repo(path):
+    import git
     try:
         _ = git.Repo(path).git_dir
         return True
@@ -52,18 +59,20 @@ def is_git_repo(path):
         return False
 
 # Extract the timestamp for a given tag in a repo
-def get_commit_time(repo:git.Repo):
+def get_commit_time(repo:'git.Repo'):
     """
     Returns the commit time based on the TIMEZONE
 
     :param repo: the repository 
     :return: the commit time
     """
+    import pytz
     commit = repo.commit()
-    commit_date = datetime.datetime.fromtimestamp(commit.committed_date, tz=TIMEZONE)
+    commit_date = datetime.datetime.fromtimestamp(commit.committed_date, tz=pytz.timezone(TIMEZONE))
     return commit_date.strftime(DATE_FORMAT)
 
 def gitCloneTeam(team_info, output_path):
+    import git, shutil, logging
     
     token = None
     with open(GIT_TOKEN_PATH, "r") as f:
@@ -135,16 +144,24 @@ def gitCloneTeam(team_info, output_path):
     return team_info
 
 
-def loadAgent(matches,superQuiet = True):
+#Load each team's agent. With keep set, an agent already loaded by this process, from the same module for the same seat,
+#is reused rather than constructed again.
+def loadAgent(matches,superQuiet = True,keep = False):
     teams = matches['teams']
     num_of_agents = len(teams)
     agents = [None]*num_of_agents
     valid_game = True
+    kept = AGENTS.setdefault(os.getpid(), {})
     for i in range(num_of_agents):
         agent_temp = None
         try:
-            mymodule = importlib.import_module(teams[i]['agent'])
-            agent_temp = mymodule.myAgent(i)
+            if keep and (teams[i]['agent'], i) in kept:
+                agent_temp = kept[(teams[i]['agent'], i)]
+            else:
+                mymodule = importlib.import_module(teams[i]['agent'])
+                agent_temp = mymodule.myAgent(i)
+                if keep:
+                    kept[(teams[i]['agent'], i)] = agent_temp
         except (NameError, ImportError, IOError):
             print('Error: Agent at "' + teams[i]['agent'] + '" could not be loaded!', file=sys.stderr)
             traceback.print_exc()
@@ -191,6 +208,274 @@ class HidePrint:
         sys.stderr = sys.stdout
 
 
+#Return num_of_agents of this process's agent workers, starting any more that are needed. Workers are looked up by pid,
+#as a forked process inherits its parent's workers, but not their threads.
+def agentWorkers(num_of_agents):
+    workers = WORKERS.setdefault(os.getpid(), [])
+    workers.extend(AgentWorker() for _ in range(num_of_agents - len(workers)))
+    return workers[:num_of_agents]
+
+#As agentWorkers, but returns ProcessWorkers (with --pinCores, pinning seat i to core i), with the teams' agents loaded
+#(or, with --keepAgents, still loaded from the last game).
+def sandboxWorkers(options, matches, GameRule):
+    teams = matches['teams']
+    workers = SANDBOXES.setdefault(os.getpid(), [])
+    for i in range(len(workers), len(teams)):
+        cpu = i % os.cpu_count() if options.pinCores else None
+        workers.append(ProcessWorker(getattr(GameRule, 'wire_format', None), cpu))
+    for i in range(len(teams)):
+        workers[i].load(teams[i]['agent'], i, fresh=not options.keepAgents)
+    return workers[:len(teams)]
+
+#Play one game with the given seed, loading a fresh set of agents for it (or, with --keepAgents, reusing this process's
+#agents from earlier games). Returns the game's record for matches, along with its replay (None if the game was
+#invalid), and whether each team's agent could be loaded.
+def playGame(options, msg, matches, GameRule, displayer, agent_names, random_seed):
+    num_of_agents = options.num_of_agents
+    num_of_warning = options.numOfWarnings
+    file_path = options.output
+    replay = None
+    game = {}
+    loaded_agents, valid_game = loadAgent(matches, superQuiet=options.superQuiet, keep=options.keepAgents)
+
+    game.update({'valid_game':valid_game})
+    game.update({'random_seed':random_seed})
+    f_name = agent_names[0]
+    for name in agent_names[-1:]:
+        f_name += '-vs-'+name
+    f_name += "-"+datetime.datetime.now().strftime("%d-%b-%Y-%H-%M-%S-%f")
+    f_name += "-"+str(random_seed) #Add seed to replay filename for reproducibility.
+    game.update({'file_name':f_name})
+    if options.saveLog: game.update({'log_path':f"{file_path}/log-{f_name}.log"})
+    #Replays of games with action encodings are written as the game is played (see replay.py).
+    recorder = None
+    if options.saveGameRecord and valid_game and hasattr(GameRule, 'encodeAction'):
+        if not os.path.exists(file_path):
+            os.makedirs(file_path, exist_ok=True)
+        game.update({'replay_path': f"{file_path}/replay-{f_name}.replay"})
+        recorder = ReplayWriter(game['replay_path'])
+    gr = Game(GameRule,
+              loaded_agents,
+              num_of_agent = num_of_agents,
+              seed=random_seed,
+              time_limit=options.warningTimeLimit,
+              warning_limit=num_of_warning,
+              displayer=displayer,
+              agents_namelist=agent_names,
+              interactive=options.interactive,
+              count_calls=options.countCalls,
+              recorder=recorder,
+              workers=sandboxWorkers(options, matches, GameRule) if options.sandbox and valid_game
+                      else agentWorkers(len(loaded_agents)))
+    if not options.print:
+        with HidePrint(options.saveLog,file_path,f_name):
+            print("Following are the print info for loading:\n{}\n".format(msg))
+            print("\n-------------------------------------\n")
+            print("Following are the print info from the game:\n")
+            if valid_game:          
+                replay = gr.Run()
+            else:
+                print("Invalid game. No game played.\n")
+    else:
+        print("Following are the print info for loading:\n{}\n".format(msg))
+        print("\n-------------------------------------\n")
+        print("Following are the print info from the game:\n")
+        if valid_game:      
+            replay = gr.Run()
+        else:
+            print("Invalid game. No game played.\n")
+    return game, replay, {i:team['load_agent'] for i,team in matches['teams'].items()}
+
+#Play the games given by args (tuples of playGame's arguments), yielding their results in order. With jobs > 1, up to
+#jobs games are played at once by a pool of processes. Once the caller stops iterating (or closes the generator), no
+#more are started, and the pool is shut down without waiting for the games in play, whose results are dropped.
+def playGames(args, jobs):
+    if jobs <= 1:
+        for game_args in args:
+            yield playGame(*game_args)
+        return
+    args = iter(args)
+    pool = ProcessPoolExecutor(jobs)
+    pending = deque()
+    try:
+        pending.extend(pool.submit(playGame, *game_args) for game_args in islice(args, jobs))
+        while pending:
+            result = pending.popleft().result()
+            pending.extend(pool.submit(playGame, *game_args) for game_args in islice(args, 1))
+            yield result
+    finally:
+        if not pending:
+            pool.shutdown(wait=True)
+        else:
+            #Stopped early. Games already in play can't be cancelled, and the interpreter would wait for them on exit,
+            #so their processes are stopped.
+            processes = list((getattr(pool, '_processes', None) or {}).values())
+            for future in pending:
+                future.cancel()
+            pool.shutdown(wait=False)
+            for process in processes:
+                process.terminate()
+
+#Add the think times of a game's moves to stats, keyed on agent name, where names gives the agent in each seat. Each
+#agent's first move (its warmup) is kept apart. Engine calls are totalled, where they were counted (see Game.Run).
+def collectTimes(stats, replay, names):
+    warmed_up = set()
+    for item in replay["actions"]:
+        (_, info), = item.items()
+        agent_id = info["agent_id"]
+        if agent_id >= len(names): #Gamemaster.
+            continue
+        agent_stats = stats.setdefault(names[agent_id], {'times':[], 'warmups':[], 'calls':0})
+        agent_stats['times' if agent_id in warmed_up else 'warmups'].append(info["think_time"])
+        agent_stats['calls'] += sum(info.get("calls", {}).values())
+        warmed_up.add(agent_id)
+
+#Per-agent summary of stats gathered by collectTimes: think time percentiles (seconds, excluding warmups), the longest
+#warmup, and engine calls per second of thinking.
+def timingSummary(stats):
+    summary = {}
+    for name,agent_stats in stats.items():
+        times = sorted(agent_stats['times']) or [0]
+        percentile = lambda p : times[min(len(times)-1, int(p*len(times)))]
+        total = sum(agent_stats['times']) + sum(agent_stats['warmups'])
+        summary[name] = {'moves':len(agent_stats['times']), 'p50':percentile(0.5), 'p95':percentile(0.95),
+                         'max':times[-1], 'warmup':max(agent_stats['warmups'], default=0),
+                         'calls_per_sec':agent_stats['calls']/total if total else 0}
+    return summary
+
+def printTimes(summary, count_calls):
+    print("Think times:")
+    for name,t in summary.items():
+        line = "    {}: p50 {:.3f}s, p95 {:.3f}s, max {:.3f}s over {} moves; longest warmup {:.3f}s".format(
+               name, t['p50'], t['p95'], t['max'], t['moves'], t['warmup'])
+        if count_calls:
+            line += "; {:.0f} engine calls/s".format(t['calls_per_sec'])
+        print(line + ".")
+
+#Write a game's replay to the output directory, noting its path in the game's record, unless it was recorded as it was
+#played.
+def saveReplay(options, game, replay):
+    if 'replay_path' in game:
+        return
+    file_path = options.output
+    if not os.path.exists(file_path):
+        os.makedirs(file_path)
+    game.update({'replay_path': f"{file_path}/replay-{game['file_name']}.replay"})
+    save_pickled(game['replay_path'], replay)
+
+
+#Play a round-robin tournament between all agents given by -a (see tournament.py). Every pair of agents plays -m games
+#in each seating, with --jobs processes. Standings are updated as results come in, in schedule order.
+def runTournament(options, msg, GameRule, random_seed):
+    assert options.num_of_agents == 2, "Tournaments are played between pairs of agents."
+    agents = options.agents.split(",")
+    agent_names = options.agent_names.split(",")
+    #Unless every agent is named, name agents after their modules.
+    if len(agent_names) != len(agents):
+        agent_names = [agent if agents.count(agent)==1 else f"{agent}-{i}" for i,agent in enumerate(agents)]
+    games = schedule(len(agents), options.multipleGames)
+    random.seed(random_seed)
+    seed_list = [random.randint(0,1e10) for _ in range(len(games))]
+
+    args = []
+    for (a,b),seed in zip(games, seed_list):
+        teams = {0:{'team_name':agent_names[a], 'agent':agents[a]}, 1:{'team_name':agent_names[b], 'agent':agents[b]}}
+        args.append((options, msg, {'teams':teams}, GameRule, None, [agent_names[a], agent_names[b]], seed))
+    results = {'games':[], 'num_of_games':len(games),
+               'teams':{i:{'team_name':agent_names[i], 'agent':agents[i]} for i in range(len(agents))}}
+    standings = Standings(agent_names)
+    stats = {}
+
+    for game_num,((a,b),(game,replay,_)) in enumerate(zip(games, playGames(args, options.jobs))):
+        game.update({'agents':(agent_names[a], agent_names[b])})
+        if game['valid_game']:
+            game.update({'scores':replay["scores"]})
+            standings.update(a, b, replay["scores"][0], replay["scores"][1])
+            collectTimes(stats, replay, [agent_names[a], agent_names[b]])
+            if not options.superQuiet:
+                print("Game ({}/{}): {} earned {}, {} earned {}.".format(game_num+1, len(games),
+                      agent_names[a], replay["scores"][0], agent_names[b], replay["scores"][1]))
+            if options.saveGameRecord:
+                saveReplay(options, game, replay)
+        elif not options.superQuiet:
+            print("Game ({}/{}): invalid game, not played.".format(game_num+1, len(games)))
+        results['games'].append(game)
+
+    if not options.superQuiet:
+        print("Standings after {} games:".format(len(games)))
+        print(standings.table())
+        printTimes(timingSummary(stats), options.countCalls)
+    results["standings"] = standings.rows()
+    results["think_times"] = timingSummary(stats)
+    results["succ"] = True
+    return results
+
+
+#Play an A/B match between the two agents given by -a, swapping seats every game, until a sequential probability ratio
+#test (see sprt.py) decides whether A is stronger than B, or -m games have been played. Games are played with --jobs
+#processes, but results are tested in order, so the outcome is reproducible for a given seed.
+def runSPRT(options, msg, GameRule, random_seed, agents, agent_names):
+    assert options.num_of_agents == 2, "SPRT matches are played between two agents."
+    random.seed(random_seed)
+    seed_list = [random.randint(0,1e10) for _ in range(options.multipleGames)]
+    args = []
+    for game_num,seed in enumerate(seed_list):
+        seats = [0,1] if game_num%2==0 else [1,0]
+        teams = {i:{'team_name':agent_names[a], 'agent':agents[a]} for i,a in enumerate(seats)}
+        args.append((options, msg, {'teams':teams}, GameRule, None, [agent_names[a] for a in seats], seed))
+    results = {'games':[], 'teams':{i:{'team_name':agent_names[i], 'agent':agents[i]} for i in range(2)}}
+    test = SPRT(options.elo0, options.elo1, options.sprtAlpha, options.sprtBeta)
+    stats = {}
+
+    games = playGames(args, options.jobs)
+    for game_num,(game,replay,_) in enumerate(games):
+        if game['valid_game']:
+            #Scores are given by seat, so find A's.
+            a_seat = game_num%2
+            score_a,score_b = replay["scores"][a_seat],replay["scores"][1-a_seat]
+            test.update(1 if score_a > score_b else 0 if score_a < score_b else 0.5)
+            game.update({'scores':replay["scores"]})
+            collectTimes(stats, replay, args[game_num][5])
+            if options.saveGameRecord:
+                saveReplay(options, game, replay)
+        results['games'].append(game)
+        if not options.superQuiet:
+            print("Game ({}/{}): {} {}-{}-{} {}, LLR {:.2f} ({:.2f}, {:.2f})".format(game_num+1, options.multipleGames,
+                  agent_names[0], test.wins, test.draws, test.losses, agent_names[1], test.llr(), test.lower, test.upper))
+        if test.status():
+            break
+    games.close() #Stop any games still to be played.
+
+    elo,lower,upper = test.estimate()
+    status = test.status()
+    if not options.superQuiet:
+        print("Over {} games, {} won {}, drew {} and lost {} against {}.".format(test.games, agent_names[0], test.wins,
+              test.draws, test.losses, agent_names[1]))
+        print("    Elo difference: {:.1f} (95% CI {:.1f} to {:.1f}).".format(elo, lower, upper))
+        print("    SPRT (elo0={}, elo1={}): {}.".format(options.elo0, options.elo1,
+              'H1 accepted, {} is stronger'.format(agent_names[0]) if status=='H1' else
+              'H0 accepted, {} is not stronger'.format(agent_names[0]) if status=='H0' else
+              'inconclusive, stopped at the game limit'))
+        printTimes(timingSummary(stats), options.countCalls)
+    results.update({'num_of_games':test.games, 'wins':test.wins, 'ties':test.draws, 'loses':test.losses,
+                    'elo':elo, 'elo_interval':(lower, upper), 'llr':test.llr(), 'sprt':status,
+                    'think_times':timingSummary(stats), 'succ':True})
+    return results
+
+
+#Load the game's displayer module and build the displayer the options ask for: text (-t) or GUI.
+def loadDisplayer(game_name, options):
+    try:
+        displayer = importlib.import_module(f"{game_name}.{game_name.lower()}_displayer")
+        if options.textgraphics:
+            return displayer.TextDisplayer()
+        return displayer.GUIDisplayer(options.half_scale, options.delay)
+    except (NameError, ImportError, IOError):
+        traceback.print_exc()
+    except:
+        pass
+    return None
+
 def run(options,msg):
     num_of_agents = options.num_of_agents
 
@@ -229,27 +514,23 @@ def run(options,msg):
     game_name = options.game 
     # matches.update({'game_name':game_name})
     GameRule = None
-    TextDisplayer = None
-    GUIDisplayer = None
 
     # import GameRule
     try:
         model = importlib.import_module(f"{game_name}.{game_name.lower()}_model")
         GameRule = getattr(model, f'{game_name}GameRule')
-        displayer = importlib.import_module(f"{game_name}.{game_name.lower()}_displayer")
-        TextDisplayer = getattr(displayer, 'TextDisplayer')
-        GUIDisplayer = getattr(displayer, 'GUIDisplayer')
     except (NameError, ImportError, IOError):
         traceback.print_exc()
         pass
     except:
         pass
 
-    displayer = GUIDisplayer(options.half_scale, options.delay)
-    if options.textgraphics:
-        displayer = TextDisplayer()
-    elif options.quiet or options.superQuiet:
-        displayer = None
+    #The displayer (and with it, the GUI toolkit) is only loaded if games are to be shown. Games played by other
+    #processes, or in tournaments and SPRT matches, can't be displayed.
+    displayer = None
+    if options.textgraphics or not (options.quiet or options.superQuiet):
+        if options.jobs <= 1 and not (options.tournament or options.sprt):
+            displayer = loadDisplayer(game_name, options)
 
     # if random seed is not provide, using timestamp
     if options.setRandomSeed == 90054:
@@ -260,62 +541,29 @@ def run(options,msg):
     # make sure random seed is traceable
     random.seed(random_seed)
     seed_list = [random.randint(0,1e10) for _ in range(1000)]
-    seed_idx = 0
 
-    num_of_warning = options.numOfWarnings
-    file_path = options.output
+    if options.tournament:
+        return runTournament(options, msg, GameRule, random_seed)
+    if options.sprt:
+        return runSPRT(options, msg, GameRule, random_seed, agents, agent_names)
 
     if options.replay != None:
         if not options.superQuiet:
             print('Replaying recorded game %s.' % options.replay)
         replay_dir = options.replay
-        replay = pickle.load(open(replay_dir,'rb'),encoding="bytes")
+        replay = load_replay(replay_dir)
         GameReplayer(GameRule,replay,displayer).Run()
     else: 
         games_results = [tuple([0]*num_of_agents for i in range(5))]
+        stats = {}
         # results = {"succ":valid_game}
-        for game_num in range(options.multipleGames):
-            game = {}
-            loaded_agents, valid_game = loadAgent(matches, superQuiet=options.superQuiet)
-
-            game.update({'valid_game':valid_game})
-            random_seed=seed_list[seed_idx]
-            seed_idx += 1
-            game.update({'random_seed':random_seed})
-            f_name = agent_names[0]
-            for name in agent_names[-1:]:
-                f_name += '-vs-'+name
-            f_name += "-"+datetime.datetime.now().strftime("%d-%b-%Y-%H-%M-%S-%f")
-            f_name += "-"+str(random_seed) #Add seed to replay filename for reproducibility.
-            game.update({'file_name':f_name})
-            if options.saveLog: game.update({'log_path':f"{file_path}/log-{f_name}.log"})
-            gr = Game(GameRule,
-                        loaded_agents,
-                        num_of_agent = num_of_agents,
-                        seed=random_seed,
-                        time_limit=options.warningTimeLimit,
-                        warning_limit=num_of_warning,
-                        displayer=displayer,
-                        agents_namelist=agent_names,
-                        interactive=options.interactive)
-            if not options.print:
-                with HidePrint(options.saveLog,file_path,f_name):
-                    print("Following are the print info for loading:\n{}\n".format(msg))
-                    print("\n-------------------------------------\n")
-                    print("Following are the print info from the game:\n")
-                    if valid_game:          
-                        replay = gr.Run()
-                    else:
-                        print("Invalid game. No game played.\n")
-            else:
-                print("Following are the print info for loading:\n{}\n".format(msg))
-                print("\n-------------------------------------\n")
-                print("Following are the print info from the game:\n")
-                if valid_game:      
-                    replay = gr.Run()
-                else:
-                    print("Invalid game. No game played.\n")
-                    
+        #Games are played one after another or, with --jobs, by a pool of processes. Either way, game i is played with
+        #seed_list[i], and results are gathered in order, so they are reproducible.
+        args = [(options, msg, matches, GameRule, displayer, agent_names, seed_list[i]) for i in range(options.multipleGames)]
+        for game_num,(game,replay,load_agent) in enumerate(playGames(args, options.jobs)):
+            valid_game = game['valid_game']
+            for i,loaded in load_agent.items():
+                matches['teams'][i].update({'load_agent': loaded})
             if valid_game:
                 # loading the current total
                 scores,totals,wins,ties,loses = games_results[len(games_results)-1]
@@ -326,6 +574,7 @@ def run(options,msg):
                 new_ties  = []
                 new_loses = []
                 game.update({f"scores":replay["scores"]})
+                collectTimes(stats, replay, agent_names)
                 
                 #Record scores.
                 for i in range(num_of_agents):
@@ -370,14 +619,9 @@ def run(options,msg):
                 games_results.append((new_scores,new_totals,new_wins, new_ties,new_loses))
 
                 if options.saveGameRecord:
-                    if not os.path.exists(file_path):
-                        os.makedirs(file_path)
                     if not options.superQuiet:
                         print("Game ({}/{}) has been recorded!".format(game_num+1,options.multipleGames))
-                    record = pickle.dumps(replay)
-                    game.update({'replay_path': f"{file_path}/replay-{f_name}.replay"})
-                    with open(f"{file_path}/replay-{f_name}.replay",'wb') as f:
-                        f.write(record)
+                    saveReplay(options, game, replay)
 
                 matches['games'].append(game)
         print(matches)
@@ -395,6 +639,7 @@ def run(options,msg):
                 for i in range(num_of_agents):
                     print("    {} earned {:.2f} on average and won {} games ({:.2f})%."\
                           .format(agent_names[i],avgs[i],wins[i],win_rates[i]))
+                printTimes(timingSummary(stats), options.countCalls)
 
             # return results as statistics
             matches["total_scores"] = totals
@@ -403,6 +648,7 @@ def run(options,msg):
             matches["ties"] = ties
             matches["loses"] = loses
             matches["win_rates"] = win_rates
+            matches["think_times"] = timingSummary(stats)
             matches["succ"] = True
 
         return matches
@@ -450,6 +696,17 @@ def loadParameter():
     parser.add_option('--startRoundWarningTimeLimit', type='float',help='Time limit for a warning of initialization for each round in seconds (default: 5)', default=5.0)
     parser.add_option('--numOfWarnings', type='int',help='Num of warnings a team can get before fail (default: 3)', default=3)
     parser.add_option('-m', '--multipleGames', type='int',help='Run multiple games in a roll', default=1)
+    parser.add_option('--tournament', action='store_true', help='Play a round-robin tournament between all agents in -a, with each pair playing -m games in each seating, and report Elo ratings (default: False)', default=False)
+    parser.add_option('--sprt', action='store_true', help='Play an A/B match between the two agents in -a, stopping as soon as a sequential probability ratio test is decided, or after -m games (default: False)', default=False)
+    parser.add_option('--elo0', type='float', help='SPRT null hypothesis: A is at most this many Elo stronger than B (default: 0)', default=0.0)
+    parser.add_option('--elo1', type='float', help='SPRT alternative hypothesis: A is at least this many Elo stronger than B (default: 20)', default=20.0)
+    parser.add_option('--sprtAlpha', type='float', help='SPRT false positive rate (default: 0.05)', default=0.05)
+    parser.add_option('--sprtBeta', type='float', help='SPRT false negative rate (default: 0.05)', default=0.05)
+    parser.add_option('--countCalls', action='store_true', help='Count the calls each agent makes to the game rule to generate actions (getLegalActions, iterLegalActions, hasLegalAction) and successors (generateSuccessor, apply), and report them per second of thinking (default: False)', default=False)
+    parser.add_option('--sandbox', action='store_true', help='Run each agent in a subprocess of its own, which is killed if it runs over time (default: False)', default=False)
+    parser.add_option('--pinCores', action='store_true', help='With --sandbox, pin the agent in seat i to CPU core i (default: False)', default=False)
+    parser.add_option('--keepAgents', action='store_true', help='Keep each agent alive from one game to the next, rather than loading a fresh one for every game; agents are told when games start and end by their on_game_start and on_game_end hooks (default: False)', default=False)
+    parser.add_option('-j', '--jobs', type='int', help='Number of processes to play multiple games in parallel; games played in parallel are not displayed (default: 1)', default=1)
     parser.add_option('--setRandomSeed', type='int',help='Set the random seed, otherwise it will be completely random (default: 90054)', default=90054)
     parser.add_option('-s','--saveGameRecord', action='store_true', help='Writes game histories to a file (named by teams\' names and the time they were played) (default: False)', default=False)
     parser.add_option('-o','--output', help='output directory for replay and log (default: output)',default='output')
@@ -0,0 +1,136 @@
+# INFORMATION ------------------------------------------------------------------------------------------------------- #
+
+# Date:    17/10/2026
+# Purpose: Implements a compact, streaming replay format, written as games are played
+# Notes:   A replay is a gzipped file of JSON lines: a header (format version, seed, agents and warning limit), then one
+#          line per move, then a footer holding the scores. Moves are [agent id, action, think time, warned], plus the
+#          engine calls made, if counted (see Game.Run), with actions stored as the game's encodings of them (see
+#          encodeAction). For games with a wire format (see worker.py), every CHECKPOINT_EVERY moves a checkpoint line
+#          precedes the move, holding the agent to move and the packed state, in base64, from which GameReplayer.seek
+#          can resume rather than replaying from the start. Lines are written as moves are played, and read back one at
+#          a time, so neither end holds the whole game in memory. Games without action encodings keep the old format:
+#          the history dict, pickled. load_replay reads either format.
+
+# IMPORTS ------------------------------------------------------------------------------------------------------------#
+
+import base64, gzip, importlib, json, pickle
+
+# CONSTANTS ----------------------------------------------------------------------------------------------------------#
+
+FORMAT  = "comp90054-replay"
+VERSION = 2 #Version 2 added checkpoints.
+CHECKPOINT_EVERY = 10
+GZIP_MAGIC = b'\x1f\x8b'
+
+# FUNCTIONS ----------------------------------------------------------------------------------------------------------#
+
+#Open a replay of either format: a ReplayReader for streaming replays, or the history dict for pickled ones.
+def load_replay(path):
+    with open(path, 'rb') as f:
+        streaming = f.read(2) == GZIP_MAGIC
+    if streaming:
+        return ReplayReader(path)
+    with open(path, 'rb') as f:
+        return pickle.load(f, encoding="bytes")
+
+#Write a history dict (as returned by Game.Run) in the old, pickled format.
+def save_pickled(path, history):
+    with open(path, 'wb') as f:
+        f.write(pickle.dumps(history))
+
+# CLASS DEF ----------------------------------------------------------------------------------------------------------#
+
+#Records a game as it's played. Handed to a Game, which calls start, then move for each move (before playing it), then
+#end.
+class ReplayWriter:
+    def __init__(self, path, checkpoint_every=CHECKPOINT_EVERY):
+        self.path = path
+        self.file = None
+        self.checkpoint_every = checkpoint_every
+
+    def start(self, game):
+        self.game = game
+        self.encode = game.game_rule.encodeAction
+        wire_format = getattr(game.game_rule, 'wire_format', None)
+        self.wire = importlib.import_module(wire_format) if wire_format and self.checkpoint_every else None
+        self.moves = 0
+        self.file = gzip.open(self.path, 'wt')
+        self._write({"format":FORMAT, "version":VERSION, "seed":game.seed, "num_of_agent":game.game_rule.num_of_agent,
+                     "agents_namelist":game.agents_namelist, "warning_limit":game.warning_limit})
+
+    def move(self, move, warned):
+        if self.wire and self.moves and self.moves % self.checkpoint_every == 0:
+            rule = self.game.game_rule
+            state = base64.b64encode(self.wire.pack_state(rule.current_game_state)).decode()
+            self._write({"checkpoint":self.moves, "agent":rule.current_agent_index, "state":state})
+        self.moves += 1
+        record = [move["agent_id"], self.encode(move["action"]), round(move["think_time"], 6), int(warned)]
+        if "calls" in move:
+            record.append(move["calls"])
+        self._write(record)
+
+    def end(self, history):
+        self._write({"scores":history["scores"]})
+        self.file.close()
+
+    def _write(self, record):
+        self.file.write(json.dumps(record, separators=(',', ':')) + '\n')
+
+
+#Reads a streaming replay. Indexing it as the history dict of a game gives the same fields, except that "actions" is a
+#generator over the moves (holding action encodings) as they're read, and "warning_positions", "scores" and
+#"checkpoints" (mapping move indices to (agent to move, packed state in base64)) are filled in as they're reached.
+class ReplayReader:
+    def __init__(self, path):
+        self.path = path
+        self.file = gzip.open(path, 'rt')
+        self.header = json.loads(self.file.readline())
+        if self.header.get("format") != FORMAT or self.header.get("version", 0) > VERSION:
+            raise ValueError('%s is not a replay this version can read.' % path)
+        self.warning_positions = []
+        self.checkpoints = {}
+        self.scores = None
+
+    def __getitem__(self, key):
+        if key == "actions":
+            return self._actions()
+        if key == "warning_positions":
+            return self.warning_positions
+        if key == "checkpoints":
+            return self.checkpoints
+        if key == "scores":
+            if self.scores is None:
+                for _ in self._actions():
+                    pass
+            return self.scores
+        return self.header[key]
+
+    #Read the whole replay into a history dict.
+    def history(self):
+        history = dict(self.header)
+        history["actions"] = list(self._actions())
+        history.update({"warning_positions":self.warning_positions, "checkpoints":self.checkpoints,
+                        "scores":self.scores})
+        return history
+
+    def _actions(self):
+        index = 0
+        for line in self.file:
+            record = json.loads(line)
+            if type(record) is dict:
+                if "checkpoint" in record:
+                    self.checkpoints[record["checkpoint"]] = (record["agent"], record["state"])
+                    continue
+                self.scores = {int(agent_id):score for agent_id,score in record["scores"].items()}
+                break
+            move = {"agent_id":record[0], "action":record[1], "think_time":record[2]}
+            if len(record) > 4:
+                move["calls"] = record[4]
+            if record[3]:
+                self.warning_positions.append((record[0], index))
+            yield {index:move}
+            index += 1
+        self.file.close()
+
+
+# END FILE -----------------------------------------------------------------------------------------------------------#
@@ -0,0 +1,182 @@
+# INFORMATION ------------------------------------------------------------------------------------------------------- #
+
+# Date:    17/10/2026
+# Purpose: Implements read-only views of game states and actions, for handing to agents in place of copies.
+# Notes:   freeze(obj) wraps obj in a view that reads through to it, freezing whatever is read in turn, and refuses any
+#          modification. Making a view is O(1), where copying a state costs more with every turn played. Views read
+#          the live object, so they are only good for the turn they are handed out in. Agents wanting to modify a state
+#          (e.g. to search ahead), or to keep it for later, should copy it first: copy.deepcopy(view), or the state's
+#          own clone(), give ordinary, unfrozen copies. thaw(obj) returns the objects behind any views in obj.
+#          Games can share(cls) classes whose objects are never modified (such as Splendor's cards), which are then
+#          handed out as they are, so that reading them costs nothing, and they can be put into states without views.
+
+# IMPORTS ------------------------------------------------------------------------------------------------------------#
+
+import copy, types
+from collections.abc import Mapping, Sequence
+
+# CONSTANTS ----------------------------------------------------------------------------------------------------------#
+
+#Objects of these types can't be modified, and so are handed out as they are.
+IMMUTABLE = (int, float, complex, str, bytes, type(None), frozenset, range, type, types.FunctionType,
+             types.BuiltinFunctionType, types.ModuleType)
+
+#Classes registered with share, whose objects are handed out as they are.
+SHARED = set()
+
+#Methods that only read their object, returning an independent copy of it (e.g. SplendorState.clone). Views call these
+#on their target directly, and hand back the copy unfrozen.
+COPY_METHODS = {'clone'}
+
+# FUNCTIONS ----------------------------------------------------------------------------------------------------------#
+
+#Treat objects of the given classes as immutable. Only for classes whose objects nothing modifies.
+def share(*classes):
+    SHARED.update(classes)
+
+def freeze(obj):
+    if type(obj) in SHARED or isinstance(obj, (Frozen,) + IMMUTABLE):
+        return obj
+    if type(obj) is tuple:
+        return tuple(freeze(item) for item in obj)
+    if isinstance(obj, dict):
+        return FrozenDict(obj)
+    if isinstance(obj, list):
+        return FrozenList(obj)
+    return FrozenView(obj)
+
+#Undo freeze. Views are replaced by their targets, including those within (unfrozen) dicts, lists and tuples, such as
+#an action an agent has assembled from parts of frozen ones.
+def thaw(obj):
+    if isinstance(obj, Frozen):
+        return object.__getattribute__(obj, '_target')
+    if type(obj) is tuple:
+        return tuple(thaw(item) for item in obj)
+    if type(obj) is dict:
+        return {key:thaw(value) for key,value in obj.items()}
+    if type(obj) is list:
+        return [thaw(item) for item in obj]
+    return obj
+
+# CLASS DEF ----------------------------------------------------------------------------------------------------------#
+
+#Behaviour common to all views. Copying a view gives an unfrozen copy of its target; a shallow copy is made deep, as it
+#would otherwise share (and expose) the target's contents. Views compare, hash, print and pickle as their targets do.
+class Frozen:
+    __slots__ = ('_target',)
+
+    def __init__(self, target):
+        object.__setattr__(self, '_target', target)
+
+    def __deepcopy__(self, memo):
+        return copy.deepcopy(self._target, memo)
+
+    def __copy__(self):
+        return copy.deepcopy(self._target)
+
+    def __reduce_ex__(self, protocol):
+        return self._target.__reduce_ex__(protocol)
+
+    def __eq__(self, other):
+        return self._target == thaw(other)
+
+    def __hash__(self):
+        return hash(self._target)
+
+    def __repr__(self):
+        return repr(self._target)
+
+    def __str__(self):
+        return str(self._target)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('Cannot set attribute %s of a read-only view.' % name)
+
+    def __delattr__(self, name):
+        raise AttributeError('Cannot delete attribute %s of a read-only view.' % name)
+
+
+#Read-only view of an object. Attributes are read from the target and frozen; methods are bound to the view, so that
+#any that try to modify the object fail, except for COPY_METHODS. The view reports the target's class, so isinstance
+#checks still pass.
+class FrozenView(Frozen):
+    __slots__ = ()
+
+    @property
+    def __class__(self):
+        return type(self._target)
+
+    def __getattr__(self, name):
+        value = getattr(self._target, name)
+        if isinstance(value, types.MethodType):
+            if value.__self__ is not self._target or name in COPY_METHODS:
+                return value
+            return types.MethodType(value.__func__, self)
+        return freeze(value)
+
+
+#Read-only view of a dict. Values are frozen as they're read; copy() gives a dict of the (frozen) values.
+class FrozenDict(Frozen, Mapping):
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        return freeze(self._target[key])
+
+    def __iter__(self):
+        return iter(self._target)
+
+    def __len__(self):
+        return len(self._target)
+
+    def __contains__(self, key):
+        return key in self._target
+
+    def copy(self):
+        return dict(self)
+
+    def __setitem__(self, key, value):
+        raise TypeError('Cannot assign to a read-only view of a dict.')
+
+    def __delitem__(self, key):
+        raise TypeError('Cannot delete from a read-only view of a dict.')
+
+    __eq__,__hash__ = Frozen.__eq__,None
+
+
+#Read-only view of a list. Items are frozen as they're read. Slicing, copy() and concatenation give lists (of frozen
+#items), which the caller is free to modify.
+class FrozenList(Frozen, Sequence):
+    __slots__ = ()
+
+    def __getitem__(self, i):
+        item = self._target[i]
+        return [freeze(x) for x in item] if isinstance(i, slice) else freeze(item)
+
+    def __iter__(self):
+        return (freeze(item) for item in self._target)
+
+    def __len__(self):
+        return len(self._target)
+
+    def __contains__(self, item):
+        return thaw(item) in self._target
+
+    def copy(self):
+        return list(self)
+
+    def __add__(self, other):
+        return list(self) + list(other)
+
+    def __radd__(self, other):
+        return list(other) + list(self)
+
+    def __setitem__(self, i, value):
+        raise TypeError('Cannot assign to a read-only view of a list.')
+
+    def __delitem__(self, i):
+        raise TypeError('Cannot delete from a read-only view of a list.')
+
+    __eq__,__hash__ = Frozen.__eq__,None
+
+
+# END FILE -----------------------------------------------------------------------------------------------------------#
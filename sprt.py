@@ -0,0 +1,78 @@
+# INFORMATION ------------------------------------------------------------------------------------------------------- #
+
+# Date:    17/10/2026
+# Purpose: Implements a sequential probability ratio test (SPRT) for A/B matches between two agents
+# Notes:   Used by general_game_runner's --sprt mode. After each game, the test weighs the hypothesis H1, that agent A is
+#          at least elo1 stronger than agent B, against H0, that it is at most elo0 stronger, and stops as soon as one
+#          is accepted at the requested error rates. The log-likelihood ratio uses the usual normal approximation for
+#          win/draw/loss results, where a draw scores one half.
+
+# IMPORTS ------------------------------------------------------------------------------------------------------------#
+
+import math
+
+# CONSTANTS ----------------------------------------------------------------------------------------------------------#
+
+#A win, a draw and a loss added to the results when estimating their variance, so that a short, one-sided match (whose
+#sample variance would be zero) can't be decided by a handful of games.
+PRIOR = (1, 1, 1)
+Z_95  = 1.96
+
+# FUNCTIONS ----------------------------------------------------------------------------------------------------------#
+
+#Expected score for an Elo difference, and vice versa.
+def elo_to_score(elo):
+    return 1 / (1 + 10 ** (-elo / 400))
+
+def score_to_elo(score):
+    score = min(max(score, 1e-3), 1 - 1e-3)
+    return -400 * math.log10(1 / score - 1)
+
+# CLASS DEF ----------------------------------------------------------------------------------------------------------#
+
+class SPRT:
+    def __init__(self, elo0=0, elo1=20, alpha=0.05, beta=0.05):
+        self.elo0,self.elo1 = elo0,elo1
+        self.lower = math.log(beta / (1 - alpha))
+        self.upper = math.log((1 - beta) / alpha)
+        self.wins,self.draws,self.losses = 0,0,0
+
+    @property
+    def games(self):
+        return self.wins + self.draws + self.losses
+
+    #Record a game from agent A's point of view: 1 for a win, 0.5 for a draw, 0 for a loss.
+    def update(self, result):
+        self.wins   += result == 1
+        self.draws  += result == 0.5
+        self.losses += result == 0
+
+    #A's mean score, and the (regularised) variance of a single game's score.
+    def _score(self):
+        score = (self.wins + self.draws/2) / self.games if self.games else 0.5
+        w,d,l = self.wins+PRIOR[0],self.draws+PRIOR[1],self.losses+PRIOR[2]
+        mean = (w + d/2) / (w + d + l)
+        var = (w*(1-mean)**2 + d*(0.5-mean)**2 + l*mean**2) / (w + d + l)
+        return score,var
+
+    def llr(self):
+        if not self.games:
+            return 0.0
+        score,var = self._score()
+        s0,s1 = elo_to_score(self.elo0),elo_to_score(self.elo1)
+        return self.games * (s1 - s0) * (2*score - s0 - s1) / (2*var)
+
+    #'H1' if A has been shown to be stronger by at least elo1, 'H0' if it has been shown not to be stronger by more than
+    #elo0, or None if the test hasn't yet decided.
+    def status(self):
+        llr = self.llr()
+        return 'H1' if llr >= self.upper else 'H0' if llr <= self.lower else None
+
+    #Estimated Elo difference of A over B, with a 95% confidence interval, as (elo, lower, upper).
+    def estimate(self):
+        score,var = self._score()
+        margin = Z_95 * math.sqrt(var / max(self.games, 1))
+        return score_to_elo(score),score_to_elo(score - margin),score_to_elo(score + margin)
+
+
+# END FILE -----------------------------------------------------------------------------------------------------------#
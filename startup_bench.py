@@ -0,0 +1,69 @@
+# INFORMATION ------------------------------------------------------------------------------------------------------- #
+
+# Date:    17/10/2026
+# Purpose: Implements a startup benchmark for general_game_runner
+# Notes:   Times, in fresh interpreters, importing the runner, a headless one-game run, and printing its help, and
+#          reports the median and fastest of several runs of each, next to a bare interpreter's for reference. With
+#          --importtime, also lists the modules that take longest to import in a headless run (from -X importtime).
+#          Run from the repository root, before and after a change to the runner's imports, to compare.
+#
+#          Usage: python startup_bench.py [-n RUNS] [--importtime]
+
+# IMPORTS ------------------------------------------------------------------------------------------------------------#
+
+import os, sys, time, statistics, subprocess
+from optparse import OptionParser
+
+# CONSTANTS ----------------------------------------------------------------------------------------------------------#
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+HEADLESS = ['general_game_runner.py', '-g', 'Splendor', '-Q', '-m', '1', '--setRandomSeed', '1']
+COMMANDS = [('python -c pass', ['-c', 'pass']),
+            ('import runner', ['-c', 'import general_game_runner']),
+            ('runner -Q -m 1', HEADLESS),
+            ('runner -h',      ['general_game_runner.py', '-h'])]
+SLOWEST = 15 #Modules listed by --importtime.
+
+# FUNCTIONS ----------------------------------------------------------------------------------------------------------#
+
+#Wall times, in seconds, of runs of python with the given arguments.
+def time_command(args, runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + args, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                       check=True)
+        times.append(time.perf_counter() - start)
+    return times
+
+#(Cumulative microseconds, module) for the slowest imports of a headless run, slowest first.
+def slowest_imports(count):
+    trace = subprocess.run([sys.executable, '-X', 'importtime'] + HEADLESS, cwd=ROOT, stdout=subprocess.DEVNULL,
+                           stderr=subprocess.PIPE, universal_newlines=True, check=True).stderr
+    imports = []
+    for line in trace.splitlines():
+        if line.startswith('import time:') and not line.endswith('package'):
+            _,cumulative,module = line[len('import time:'):].split('|')
+            imports.append((int(cumulative), module.strip()))
+    return sorted(imports, reverse=True)[:count]
+
+# MAIN ---------------------------------------------------------------------------------------------------------------#
+
+def main(argv):
+    parser = OptionParser(usage='python startup_bench.py [options]')
+    parser.add_option('-n', '--runs', type='int', default=20, help='Runs of each command (default: 20)')
+    parser.add_option('--importtime', action='store_true', default=False,
+                      help='Also list the slowest imports of a headless run')
+    options,_ = parser.parse_args(argv)
+    for name,args in COMMANDS:
+        times = time_command(args, options.runs)
+        print('%-16s median %6.1f ms, fastest %6.1f ms' % (name, 1000*statistics.median(times), 1000*min(times)))
+    if options.importtime:
+        print('Slowest imports of a headless run (cumulative):')
+        for cumulative,module in slowest_imports(SLOWEST):
+            print('%8.1f ms  %s' % (cumulative / 1000, module))
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
+
+# END FILE -----------------------------------------------------------------------------------------------------------#
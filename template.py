@@ -61,6 +61,16 @@ class Agent(object):
     def SelectAction(self, actions, game_state):
         return random.choice(actions)
 
+    # Called before each game the agent plays, with its view of the initial game state. An agent may be kept
+    # for several games (see general_game_runner's --keepAgents), so anything it tracks per game is best reset here,
+    # and anything expensive to set up is best done in __init__.
+    def on_game_start(self, game_state):
+        pass
+
+    # Called after each game the agent plays, with its view of the final game state and the scores, by agent id.
+    def on_game_end(self, game_state, scores):
+        pass
+
 
 class Displayer:
     def __init__(self):
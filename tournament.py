@@ -0,0 +1,74 @@
+# INFORMATION ------------------------------------------------------------------------------------------------------- #
+
+# Date:    17/10/2026
+# Purpose: Implements round-robin scheduling and ratings for tournaments between agents
+# Notes:   Used by general_game_runner's --tournament mode, which plays the scheduled games (in parallel, with --jobs)
+#          and feeds each result to a Standings in schedule order, so that ratings are reproducible for a given seed.
+#          Ratings are Elo ratings, updated incrementally after every game.
+
+# CONSTANTS ----------------------------------------------------------------------------------------------------------#
+
+INITIAL_RATING = 1500
+K_FACTOR       = 16
+
+# FUNCTIONS ----------------------------------------------------------------------------------------------------------#
+
+#Return the games to be played between num_entrants entrants, as (first seat, second seat) pairs of entrant indices.
+#Every pair of entrants meets games_per_seat times in each seating, and games are ordered round by round, so that a
+#tournament cut short has still seen every pairing about equally often.
+def schedule(num_entrants, games_per_seat=1):
+    pairs = [(i, j) for i in range(num_entrants) for j in range(i+1, num_entrants)]
+    games = []
+    for _ in range(games_per_seat):
+        games += pairs
+        games += [(j, i) for i,j in pairs]
+    return games
+
+#Expected score of a player rated rating_a against one rated rating_b.
+def expected_score(rating_a, rating_b):
+    return 1 / (1 + 10 ** ((rating_b - rating_a) / 400))
+
+# CLASS DEF ----------------------------------------------------------------------------------------------------------#
+
+#Ratings and win/tie/loss records of a tournament's entrants, updated one game at a time.
+class Standings:
+    def __init__(self, names, k_factor=K_FACTOR, initial_rating=INITIAL_RATING):
+        self.names    = list(names)
+        self.k_factor = k_factor
+        self.ratings  = [initial_rating] * len(names)
+        self.games    = [0] * len(names)
+        self.wins     = [0] * len(names)
+        self.ties     = [0] * len(names)
+        self.losses   = [0] * len(names)
+        self.points   = [0] * len(names)
+
+    #Record a game between entrants a and b, given the scores each achieved.
+    def update(self, a, b, score_a, score_b):
+        result = 1 if score_a > score_b else 0 if score_a < score_b else 0.5
+        change = self.k_factor * (result - expected_score(self.ratings[a], self.ratings[b]))
+        self.ratings[a] += change
+        self.ratings[b] -= change
+        for i,score,outcome in [(a, score_a, result), (b, score_b, 1-result)]:
+            self.games[i]  += 1
+            self.points[i] += score
+            self.wins[i]   += outcome == 1
+            self.ties[i]   += outcome == 0.5
+            self.losses[i] += outcome == 0
+
+    #Rows of (name, rating, games, wins, ties, losses, average score), best rated first.
+    def rows(self):
+        rows = [(self.names[i], self.ratings[i], self.games[i], self.wins[i], self.ties[i], self.losses[i],
+                 self.points[i] / self.games[i] if self.games[i] else 0) for i in range(len(self.names))]
+        return sorted(rows, key=lambda row : row[1], reverse=True)
+
+    def table(self):
+        width = max([len(name) for name in self.names] + [5])
+        lines = ["{:>4}  {:<{w}}  {:>6}  {:>5}  {:>4}  {:>4}  {:>4}  {:>9}".format(
+                 'Rank', 'Agent', 'Rating', 'Games', 'Wins', 'Ties', 'Loss', 'Avg.Score', w=width)]
+        for rank,(name,rating,games,wins,ties,losses,avg) in enumerate(self.rows()):
+            lines.append("{:>4}  {:<{w}}  {:>6.0f}  {:>5}  {:>4}  {:>4}  {:>4}  {:>9.2f}".format(
+                         rank+1, name, rating, games, wins, ties, losses, avg, w=width))
+        return "\n".join(lines)
+
+
+# END FILE -----------------------------------------------------------------------------------------------------------#
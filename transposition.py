@@ -0,0 +1,78 @@
+# INFORMATION ------------------------------------------------------------------------------------------------------- #
+
+# Date:    17/10/2026
+# Purpose: Implements a bounded transposition table, for use by search agents.
+# Notes:   The table has a fixed number of slots, indexed by the low bits of a 64-bit state key (e.g. the Zobrist hash
+#          kept on SplendorState). Entries are plain tuples of (key, depth, value, flag, move, age). When two keys
+#          collide on a slot, entries from older searches are replaced first, and otherwise the deeper search is kept.
+
+# CONSTANTS ----------------------------------------------------------------------------------------------------------#
+
+#Kinds of stored value: exact, or a lower/upper bound (from a search that failed high/low).
+EXACT,LOWER,UPPER = 0,1,2
+
+#Entry fields.
+KEY,DEPTH,VALUE,FLAG,MOVE,AGE = range(6)
+
+# FUNCTIONS ----------------------------------------------------------------------------------------------------------#
+
+#Classify the result of an alpha-beta search given the window (alpha, beta) it was searched with.
+def bound_flag(value, alpha, beta):
+    if value <= alpha:
+        return UPPER
+    if value >= beta:
+        return LOWER
+    return EXACT
+
+# CLASS DEF ----------------------------------------------------------------------------------------------------------#
+
+class TranspositionTable:
+    def __init__(self, size_bits=16):
+        self.mask    = (1 << size_bits) - 1
+        self.entries = [None] * (1 << size_bits)
+        self.age     = 0
+
+    #Mark the start of a new search (e.g. a new turn). Entries from earlier searches remain usable, but are the first
+    #to be replaced.
+    def new_search(self):
+        self.age += 1
+
+    def clear(self):
+        self.entries = [None] * len(self.entries)
+        self.age = 0
+
+    #Return the entry stored for key, or None.
+    def lookup(self, key):
+        entry = self.entries[key & self.mask]
+        return entry if entry is not None and entry[KEY] == key else None
+
+    def store(self, key, depth, value, flag, move=None):
+        i = key & self.mask
+        entry = self.entries[i]
+        if entry is None or entry[KEY] == key or entry[AGE] != self.age or depth >= entry[DEPTH]:
+            self.entries[i] = (key, depth, value, flag, move, self.age)
+
+    #Consult the table for a node about to be searched to the given depth within the window (alpha, beta). Returns
+    #(value, alpha, beta, move): value is not None if the stored result decides the node outright; otherwise alpha and
+    #beta are the window narrowed by any stored bound, and move is the best move stored for the node (if any), to be
+    #tried first. The stored value is multiplied by scale, for callers that store values normalised by some factor.
+    def probe(self, key, depth, alpha, beta, scale=1):
+        entry = self.lookup(key)
+        if entry is None:
+            return None, alpha, beta, None
+        if entry[DEPTH] >= depth:
+            value,flag = entry[VALUE] * scale,entry[FLAG]
+            if flag == EXACT:
+                return value, alpha, beta, entry[MOVE]
+            if flag == LOWER:
+                alpha = max(alpha, value)
+            else:
+                beta = min(beta, value)
+            if alpha >= beta:
+                return value, alpha, beta, entry[MOVE]
+        return None, alpha, beta, entry[MOVE]
+
+    def __len__(self):
+        return sum(entry is not None for entry in self.entries)
+
+# END FILE -----------------------------------------------------------------------------------------------------------#
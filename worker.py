@@ -0,0 +1,208 @@
+# INFORMATION ------------------------------------------------------------------------------------------------------- #
+
+# Date:    17/10/2026
+# Purpose: Implements persistent per-agent workers, which run agents' SelectAction calls under a time limit.
+# Notes:   Each AgentWorker owns one long-lived thread, which is handed the agent's turns one at a time and can be kept
+#          for any number of moves and games (reassign worker.agent between games). A turn that runs over its time
+#          limit is abandoned: select raises AgentTimeout straight away, and the worker interrupts the agent's call by
+#          raising AgentTimeout inside its thread. The interrupt lands at the agent's next Python instruction, so an
+#          agent stuck inside a long-running C call (e.g. a large numpy operation) keeps its thread until that returns,
+#          and its next turn waits for it.
+#          A ProcessWorker runs its agent in a long-lived subprocess instead, so that a CPU-heavy agent can't slow the
+#          game or its opponents (and can be pinned to a core of its own). States and actions cross the pipe in the
+#          game's wire format (e.g. Splendor.splendor_compact's), or pickled. An agent that runs over its time limit is
+#          killed, and a fresh copy of it is loaded for its next turn, so it loses anything it remembered.
+#          Both also pass on the agent's lifecycle hooks (on_game_start and on_game_end; see template.Agent), which are
+#          run like its turns, but without a time limit.
+
+# IMPORTS ------------------------------------------------------------------------------------------------------------#
+
+import ctypes, importlib, itertools, multiprocessing, os, pickle, queue, random, threading, time
+from   snapshot import thaw
+
+# FUNCTIONS ----------------------------------------------------------------------------------------------------------#
+
+#Default wire format for ProcessWorkers: everything is pickled.
+pack_state = pack_actions = pack_action = pickle.dumps
+unpack_state = unpack_actions = unpack_action = pickle.loads
+
+#Main loop of a ProcessWorker's subprocess. Requests are ('load', agent module, agent id), ('select', packed state,
+#packed actions, seed) or ('hook', hook name, packed state, further arguments); replies are (True, result) or (False,
+#error message).
+def _serve(conn, wire_format, cpu):
+    if cpu is not None and hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, {cpu})
+    wire = importlib.import_module(wire_format)
+    agent = None
+    while True:
+        request = conn.recv()
+        if request is None:
+            return
+        try:
+            if request[0] == 'load':
+                agent = importlib.import_module(request[1]).myAgent(request[2])
+                reply = None
+            elif request[0] == 'hook':
+                hook = getattr(agent, request[1], None)
+                reply = hook(wire.unpack_state(request[2]), *request[3]) if hook else None
+            else:
+                actions,state = wire.unpack_actions(request[2]),wire.unpack_state(request[1])
+                random.seed(request[3])
+                reply = wire.pack_action(agent.SelectAction(actions, state))
+            conn.send((True, reply))
+        except Exception as e:
+            conn.send((False, '%s: %s' % (type(e).__name__, e)))
+
+# CLASS DEF ----------------------------------------------------------------------------------------------------------#
+
+#A BaseException, like KeyboardInterrupt, so that agents catching Exception can't swallow the interrupt.
+class AgentTimeout(BaseException):
+    pass
+
+
+class AgentWorker:
+    def __init__(self, agent=None):
+        self.agent   = agent
+        self.tickets = itertools.count()
+        self.busy    = None #Ticket of the turn being played, if any.
+        self.lock    = threading.Lock()
+        self.jobs    = queue.Queue()
+        self.results = queue.Queue()
+        self.thread  = threading.Thread(target=self._loop, daemon=True)
+        self.thread.start()
+
+    #Have the agent select one of actions in state, within timeout seconds (or any time, if timeout is None). Returns
+    #the selected action, or raises AgentTimeout, or whatever the agent raised.
+    def select(self, actions, state, timeout=None):
+        return self._call(self.agent.SelectAction, (actions, state), timeout)
+
+    #Call the agent's lifecycle hook (e.g. on_game_start), if it has one, with state and args, and wait for it to return.
+    def notify(self, hook, state, *args):
+        method = getattr(self.agent, hook, None)
+        if method is not None:
+            self._call(method, (state,) + args)
+
+    #Stop the worker's thread once it finishes any turn it's playing.
+    def close(self):
+        self.jobs.put(None)
+
+    def _call(self, function, args, timeout=None):
+        ticket = next(self.tickets)
+        self.jobs.put((ticket, function, args))
+        #Discarding results of earlier, abandoned turns mustn't extend the time limit, so it runs to a fixed deadline.
+        deadline = None if timeout is None else time.monotonic() + timeout
+        try:
+            while True:
+                remaining = None if deadline is None else max(0, deadline - time.monotonic())
+                result_ticket,ok,result = self.results.get(timeout=remaining)
+                if result_ticket == ticket: #Discard results of earlier, abandoned turns.
+                    break
+        except queue.Empty:
+            self._interrupt(ticket)
+            raise AgentTimeout('Agent did not select an action within %s seconds.' % timeout)
+        if not ok:
+            raise result
+        return result
+
+    def _interrupt(self, ticket):
+        with self.lock:
+            if self.busy == ticket:
+                ctypes.pythonapi.PyThreadState_SetAsyncExc(ctypes.c_ulong(self.thread.ident),
+                                                           ctypes.py_object(AgentTimeout))
+
+    def _loop(self):
+        while True:
+            #An interrupt meant for a turn can arrive just after it ends, so the whole loop is guarded against one.
+            try:
+                job = self.jobs.get()
+                if job is None:
+                    return
+                ticket,function,args = job
+                with self.lock:
+                    self.busy = ticket
+                try:
+                    result = ticket,True,function(*args)
+                except BaseException as e:
+                    result = ticket,False,e
+                with self.lock:
+                    self.busy = None
+                self.results.put(result)
+            except AgentTimeout:
+                pass
+
+
+#Runs an agent, loaded from its module, in a subprocess. select works as it does for AgentWorker (the agent attribute
+#is unused). cpu optionally pins the subprocess to a core.
+class ProcessWorker:
+    def __init__(self, wire_format=None, cpu=None):
+        self.agent       = None
+        self.wire_format = wire_format or __name__
+        self.wire        = importlib.import_module(self.wire_format)
+        self.cpu         = cpu
+        self.module      = None
+        self.process     = None
+
+    #Load a fresh agent, myAgent(agent_id) from the given module, in the subprocess (starting one if necessary). With
+    #fresh unset, an agent already loaded from the same module, with the same id, is kept instead.
+    def load(self, module, agent_id, fresh=True):
+        if not fresh and self.process is not None and (module, agent_id) == (self.module, self.agent_id):
+            return
+        self.module,self.agent_id = module,agent_id
+        if self.process is None:
+            self.conn,child_conn = multiprocessing.Pipe()
+            self.process = multiprocessing.Process(target=_serve, args=(child_conn, self.wire_format, self.cpu),
+                                                   daemon=True)
+            self.process.start()
+            child_conn.close()
+        try:
+            self._request(('load', module, agent_id))
+        except RuntimeError:
+            self._kill() #Try again on the agent's first turn, where the error counts against it.
+
+    def select(self, actions, state, timeout=None):
+        if self.process is None:
+            self.load(self.module, self.agent_id)
+        #The agent's random numbers are drawn from the game's generator, as they would be if it were run in process.
+        self.conn.send(('select', self.wire.pack_state(thaw(state)), self.wire.pack_actions(thaw(actions)),
+                        random.getrandbits(64)))
+        if not self.conn.poll(timeout):
+            self._kill()
+            raise AgentTimeout('Agent did not select an action within %s seconds.' % timeout)
+        return self.wire.unpack_action(self._reply())
+
+    def notify(self, hook, state, *args):
+        if self.process is None:
+            self.load(self.module, self.agent_id)
+        self._request(('hook', hook, self.wire.pack_state(thaw(state)), args))
+
+    def close(self):
+        if self.process is not None:
+            self.conn.send(None)
+            self.process.join(1)
+            self._kill()
+
+    def _request(self, request):
+        self.conn.send(request)
+        return self._reply()
+
+    def _reply(self):
+        try:
+            ok,result = self.conn.recv()
+        except (EOFError, OSError): #The subprocess died.
+            self._kill()
+            raise RuntimeError('Agent process exited unexpectedly.')
+        if not ok:
+            raise RuntimeError(result)
+        return result
+
+    def _kill(self):
+        if self.process is None:
+            return
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join()
+        self.conn.close()
+        self.process = None
+
+
+# END FILE -----------------------------------------------------------------------------------------------------------#